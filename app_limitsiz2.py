@@ -1,217 +1,192 @@
 import streamlit as st
-import requests
-import pandas as pd
-import plotly.graph_objects as go
-import pandas_ta as ta
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import yfinance as yf
-from datetime import datetime, timedelta
+
+import charts
+import data_sources
+import indicators
+import bars
+import live_feed
+import metrics
+import prefetch
 
 
 
 st.set_page_config(page_title="Raporlar", page_icon=":bar_chart:", layout="wide")  
 
+# Top‑N coin + BIST 100 arka planda tazelenir (sunucu başına bir kez başlar)
+prefetch.start()
+# Prometheus metinleri: http://127.0.0.1:9464/metrics (METRICS_PORT=0 kapatır)
+metrics.serve()
+metrics.begin_trace()
+
 st.sidebar.header("Sayfa Seçin")  # sidebar ana naşlık
 
 page = st.sidebar.radio(                                                         
    "Sayfalar:",                                                               # sidebar alt başlık ve burada oluşturmak istediğim raporları yazıyorum ve sayfarı oluşturuyor. 
-  ("CRYPTO ANALYSIS", "BIST ANALYSIS", "SINGLE ANALYSIS")      # radio metodu yuvarlak seçenek seçtirerek ayrı ayrı sayfalar oluşturuyor.  
+  ("CRYPTO ANALYSIS", "BIST ANALYSIS", "SINGLE ANALYSIS", "SCANNER", "CORRELATION")      # radio metodu yuvarlak seçenek seçtirerek ayrı ayrı sayfalar oluşturuyor.  
 )
 
-if page == "CRYPTO ANALYSIS":
+# Debug paneli sayfa çizildikten sonra doldurulur (bu rerun'ın aşama süreleri)
+debug_on = st.sidebar.checkbox("Debug: aşama süreleri", value=False)
+debug_box = st.sidebar.container()
 
-    # -------------------------------------------------
-    # Rate‑limit dostu session
-    # -------------------------------------------------
-    session = requests.Session()
-    session.headers.update({
-        "Accept": "application/json",
-        "User-Agent": "Mozilla/5.0 (Streamlit Kripto App)"
-    })
 
-    st.set_page_config(page_title="Kripto Takip", page_icon="Chart", layout="wide")
-    st.title("4Crypto Price Chart")
+# -------------------------------------------------
+# Ortak parçalar (tüm sayfalar aynı kaynak → gösterge → grafik hattını kullanır)
+# -------------------------------------------------
+def get_symbol_list(source_name):
+    # Liste kaynakta tutulur (kripto: diskteki coin evreni, arka planda tazelenir);
+    # rerun'da sadece hazır nesne döner → SymbolList(labels, ids, names)
+    with metrics.stage("symbol_list"):
+        symbols, warning = data_sources.SOURCES[source_name].list_symbols()
+    if warning:
+        # Tekrar denemeler de bitti → o ana kadar gelen sayfalarla devam
+        st.warning(warning)
+    return symbols
 
-    # -------------------------------------------------
-    # Coin listesi (tek istek, cache)
-    # -------------------------------------------------
-    @st.cache_data(ttl=3600)
-    def get_coin_list():
-        all_data = []
-        base_url = "https://api.coingecko.com/api/v3/coins/markets"
-        for page in range(1, 5):
-            params = {
-                "vs_currency": "usd",
-                "order": "market_cap_desc",
-                "per_page": 250,
-                "page": page,
-                "sparkline": False,
-            }
-            try:
-                time.sleep(1.4)  # sadece coin listesi için
-                r = session.get(base_url, params=params, timeout=15)
-                if r.status_code == 429:
-                    st.error("Rate limit! 1‑2 dakika bekleyin.")
-                    return pd.DataFrame()
-                if r.status_code != 200:
-                    continue
-                data = r.json()
-                if not data:
-                    break
-                all_data.extend(data)
-                if len(data) < 250:
-                    break
-            except:
-                continue
-        if not all_data:
-            st.error("Coin listesi alınamadı.")
-            return pd.DataFrame()
-
-        df = pd.DataFrame(all_data)
-        df = df[["id", "symbol", "name", "current_price", "market_cap_rank"]]
-        exclude = ["bridged", "wrapped", "vault", "token", "usd", "usdc", "usdt", "tether", "stake", "stable"]
-        mask = ~df["id"].str.contains("|".join(exclude), case=False, na=False)
-        df = df[mask].sort_values("market_cap_rank").reset_index(drop=True)
-        return df
-
-    with st.spinner("Coin listesi yükleniyor…"):
-        coin_df = get_coin_list()
-    if coin_df.empty:
-        st.stop()
 
-    # -------------------------------------------------
-    # Zaman aralığı (90 gün varsayılan)
-    # -------------------------------------------------
+def select_days():
+    # Zaman aralığı (90 gün varsayılan) + seyreltme
     day_options = {"1 Gün": 1, "7 Gün": 7, "30 Gün": 30, "90 Gün": 90, "180 Gün": 180, "365 Gün": 365}
     selected_day_label = st.selectbox("Zaman Aralığı:", list(day_options.keys()), index=3)
-    days = day_options[selected_day_label]
+    downsample_on = st.checkbox("Grafik seyreltme (LTTB)", value=True,
+                                help="Çizgi başına nokta sayısını grafik genişliğiyle sınırlar; kapalıyken tüm noktalar çizilir.")
+    return day_options[selected_day_label], downsample_on
+
+
+def select_bars(source):
+    # Bar aralığı: "Ham" depodaki seri; diğerleri aynı seriden yerel olarak kurulur (ek çekim yok)
+    options = ["Ham"] + source.timeframes()
+    label = st.selectbox("Bar aralığı:", options, index=0,
+                         help="4 saat / 1 gün / 1 hafta barları depodaki en ince seriden türetilir.")
+    if label == "Ham":
+        return None, False
+    candles = st.radio("Grafik türü:", ["Çizgi", "Mum"], index=1, horizontal=True) == "Mum"
+    return bars.TIMEFRAMES[label], candles
+
+
+def select_live(source, timeframe=None):
+    # Canlı mod sadece anlık fiyatı olan kaynaklarda (BIST serisi günlük bar) ve ham seride
+    if not source.live or timeframe is not None:
+        return None
+    if not st.checkbox("Canlı mod", value=False,
+                       help="Son fiyatlar aralıkla çekilir; seriye sadece yeni nokta eklenir, sayfa baştan çalışmaz."):
+        return None
+    return live_feed.LIVE_INTERVALS[st.selectbox("Güncelleme aralığı:", list(live_feed.LIVE_INTERVALS), index=1)]
+
+
+def stale_badge(source, frames):
+    # Bayat veri beklemeden gösterilir (tazelemesi arka planda); son iyi çekimin zamanı
+    since = [t for t in (source.stale_since(df) for df in frames) if t is not None]
+    if not since:
+        return
+    oldest = min(since)
+    what = f"{len(since)} sembolde bayat veri" if len(frames) > 1 else "Bayat veri"
+    st.caption(f"⏳ {what} · son güncelleme {time.strftime('%H:%M', time.gmtime(oldest))} UTC "
+               f"({(time.time() - oldest) / 60:.0f} dk önce) · arka planda yenileniyor")
+
+
+def create_chart(kind, source, data, title, downsample_on, candles=False):
+    # Layout ve trace stilleri önbellekteki şablondan, sadece veri + başlık yeni
+    if data is None or data.empty:
+        return charts.empty_figure(), None
+    df = data
+    # Mumlar seyreltilmez (her bar ayrı OHLC); bar sayısı zaten pencere / bar aralığı
+    if downsample_on and not candles:
+        with metrics.stage("downsample"):
+            df = charts.downsample(df, charts.HALF_WIDTH_POINTS if kind == "half" else charts.FULL_WIDTH_POINTS)
+    price_name = f"Fiyat ({source.currency})" if source.currency else "Fiyat"
+    with metrics.stage("figure"):
+        fig = charts.price_figure(kind, df, title, price_name=price_name,
+                                  yaxis_title=price_name if kind == "full" else None, candles=candles)
+    return fig, df["Close"].iloc[-1]
+
+
+def render_chart(kind, source, frames, sym, label, days, downsample_on, live_every, key, metric_label,
+                 timeframe=None, candles=False):
+    # Grafik + metrik; canlı modda fragment olarak kendi başına yenilenir
+    @st.fragment(run_every=live_every)
+    def cell():
+        data = frames[sym]
+        title = f'{label.split(" (")[0]} – {days} Gün' if kind == "half" else f"{label} – Son {days} Gün"
+        if timeframe is not None:
+            title += f" · {next(k for k, v in bars.TIMEFRAMES.items() if v == timeframe)}"
+        fig_key = f"{key}_fig"
+        if live_every and data is not None:
+            # Tek istek sayfadaki tüm coin'leri tazeler; son noktası çizilenle aynı grafik yeniden kurulmaz
+            points = live_feed.apply_ticks(list(frames), days, live_every)
+            sig = (sym, days, downsample_on, points.get(sym))
+            if st.session_state.get(fig_key, (None,))[0] != sig:
+                live = live_feed.frame(sym, days)
+                if live is not None:
+                    data = live
+                st.session_state[fig_key] = (sig, *create_chart(kind, source, data, title, downsample_on))
+            _, fig, p = st.session_state[fig_key]
+        else:
+            st.session_state.pop(fig_key, None)
+            fig, p = create_chart(kind, source, data, title, downsample_on, candles)
+        # Figür JSON'a burada çevrilir (Plotly serileştirme)
+        with metrics.stage("plotly_chart"):
+            st.plotly_chart(fig, use_container_width=True, key=key)
+        st.metric(metric_label, source.format_price(p) if p else "N/A")
+        if not live_every:
+            stale_badge(source, [data])
+
+    cell()
+
+
+def grid_page(source, title):
+    # 2×2 düzen: 4 sembol, tek toplu yükleme
+    st.title(title)
+    with st.spinner("Sembol listesi yükleniyor…"):
+        symbols = get_symbol_list(source.name)
+    if not symbols.labels:
+        st.error("Sembol listesi alınamadı.")
+        st.stop()
 
-    # -------------------------------------------------
-    # 4 kripto seçimi
-    # -------------------------------------------------
-    col1, col2 = st.columns(2)
-    with col1:
-        coin_opts = coin_df["name"] + " (" + coin_df["symbol"].str.upper() + ")"
-        coin1_label = st.selectbox("1. Kripto Para", coin_opts, index=0)
-        coin1_id = coin_df.loc[coin_opts == coin1_label, "id"].values[0]
-        coin2_label = st.selectbox("2. Kripto Para", coin_opts, index=1)
-        coin2_id = coin_df.loc[coin_opts == coin2_label, "id"].values[0]
-    with col2:
-        coin3_label = st.selectbox("3. Kripto Para", coin_opts, index=2)
-        coin3_id = coin_df.loc[coin_opts == coin3_label, "id"].values[0]
-        coin4_label = st.selectbox("4. Kripto Para", coin_opts, index=3)
-        coin4_id = coin_df.loc[coin_opts == coin4_label, "id"].values[0]
+    days, downsample_on = select_days()
+    timeframe, candles = select_bars(source)
+    live_every = select_live(source, timeframe)
 
     # -------------------------------------------------
-    # TEK SEFERDE 4 COİN VERİSİ ÇEK (PARALEL)
+    # 4 sembol seçimi
     # -------------------------------------------------
-    @st.cache_data(ttl=300)
-    def fetch_price_data(coin_id, days):
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {"vs_currency": "usd", "days": days}
-        try:
-            r = session.get(url, params=params, timeout=15)
-            if r.status_code != 200:
-                return coin_id, None
-            data = r.json()
-            if "prices" not in data or not data["prices"]:
-                return coin_id, None
-            return coin_id, data
-        except:
-            return coin_id, None
-
-    # Tüm verileri aynı anda çek
-    coin_ids = [coin1_id, coin2_id, coin3_id, coin4_id]
-    labels = [coin1_label, coin2_label, coin3_label, coin4_label]
-
-    with st.spinner("4 coin verisi paralel çekiliyor…"):
-        results = {}
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_coin = {executor.submit(fetch_price_data, cid, days): (cid, lbl) for cid, lbl in zip(coin_ids, labels)}
-            for future in as_completed(future_to_coin):
-                coin_id, data = future.result()
-                label = future_to_coin[future][1]
-                results[coin_id] = (label, data)
+    col1, col2 = st.columns(2)
+    picks = []
+    for i in range(4):
+        with (col1 if i < 2 else col2):
+            label = st.selectbox(f"{i + 1}. {source.item_label}", symbols.labels, index=i)
+            picks.append((symbols.ids[label], label))
 
     # -------------------------------------------------
-    # Grafik fonksiyonu
+    # TEK SEFERDE 4 SEMBOL (kalıcı depodan, SMA200 ısınma satırları dahil)
     # -------------------------------------------------
-    def create_chart(coin_id, label, days):
-        _, data = results.get(coin_id, (None, None))
-        if not data:
-            fig = go.Figure()
-            fig.add_annotation(text="Veri alınamadı", xref="paper", yref="paper",
-                            x=0.5, y=0.5, showarrow=False, font=dict(size=14, color="red"))
-            fig.update_layout(template="plotly_dark", height=380, margin=dict(l=30, r=30, t=70, b=30))
-            return fig, None
-
-        df = pd.DataFrame(data["prices"], columns=["timestamp", "Close"])
-        df["timestamp"] = df["timestamp"].apply(lambda x: datetime.fromtimestamp(x / 1000))
-        df.set_index("timestamp", inplace=True)
-
+    with st.spinner(f"4 {source.item_label.lower()} verisi toplu çekiliyor…"):
         try:
-            df["SMA20"] = ta.sma(df["Close"], length=20)
-            df["SMA50"] = ta.sma(df["Close"], length=50)
-            df["SMA100"] = ta.sma(df["Close"], length=100)
-            df["SMA200"] = ta.sma(df["Close"], length=200)
-        except:
-            pass
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df["Close"],
-            mode="lines", name="Fiyat",
-            line=dict(color="#00CED1", width=2),
-            fill="tozeroy", fillcolor="rgba(0, 206, 209, 0.05)"
-        ))
-
-        sma_cfg = [("SMA20", "#ADD8E6", "SMA20"), ("SMA50", "#FFFF99", "SMA50"),
-                ("SMA100", "#FFA500", "SMA100"), ("SMA200", "#FF0000", "SMA200")]
-        for col, colr, name in sma_cfg:
-            if col in df.columns and df[col].notna().any():
-                fig.add_trace(go.Scatter(x=df.index, y=df[col], mode="lines", name=name,
-                                    line=dict(color=colr, width=1.5)))
-
-        fig.update_layout(
-            title=f'{label.split(" (")[0]} – {days} Gün',
-            title_font=dict(size=16, family="Arial", color="#FFFFFF"),
-            xaxis=dict(tickangle=45, tickfont=dict(size=10, color="#CCCCCC"),
-                    gridcolor="rgba(128,128,128,0.2)"),
-            yaxis=dict(tickfont=dict(size=10, color="#CCCCCC"),
-                    gridcolor="rgba(128,128,128,0.2)"),
-            hovermode="x unified", showlegend=True,
-            legend=dict(font=dict(size=9), bgcolor="rgba(0,0,0,0.5)"),
-            template="plotly_dark",
-            margin=dict(l=20, r=20, t=50, b=20),
-            height=380
-        )
-        return fig, df["Close"].iloc[-1]
+            frames = data_sources.load_frames(source, [sym for sym, _ in picks], days, timeframe=timeframe)
+        except Exception as e:
+            metrics.error(f"page.{source.name}", e)
+            st.error(f"Veri hatası: {e}")
+            frames = {sym: None for sym, _ in picks}
 
     # -------------------------------------------------
     # 2×2 grafik düzeni
     # -------------------------------------------------
     st.markdown("---")
+    for row in range(2):
+        cols = st.columns(2)
+        for j in range(2):
+            i = row * 2 + j
+            sym, label = picks[i]
+            with cols[j]:
+                render_chart("half", source, frames, sym, label, days, downsample_on, live_every,
+                             f"chart_{i + 1}", label.split(" (")[0], timeframe, candles)
+
 
-    c1, c2 = st.columns(2)
-    with c1:
-        fig1, p1 = create_chart(coin1_id, coin1_label, days)
-        st.plotly_chart(fig1, use_container_width=True, key="chart_1")
-        st.metric(coin1_label.split(" (")[0], f"${p1:,.6f}" if p1 else "N/A")
-    with c2:
-        fig2, p2 = create_chart(coin2_id, coin2_label, days)
-        st.plotly_chart(fig2, use_container_width=True, key="chart_2")
-        st.metric(coin2_label.split(" (")[0], f"${p2:,.6f}" if p2 else "N/A")
-
-    c3, c4 = st.columns(2)
-    with c3:
-        fig3, p3 = create_chart(coin3_id, coin3_label, days)
-        st.plotly_chart(fig3, use_container_width=True, key="chart_3")
-        st.metric(coin3_label.split(" (")[0], f"${p3:,.6f}" if p3 else "N/A")
-    with c4:
-        fig4, p4 = create_chart(coin4_id, coin4_label, days)
-        st.plotly_chart(fig4, use_container_width=True, key="chart_4")
-        st.metric(coin4_label.split(" (")[0], f"${p4:,.6f}" if p4 else "N/A")
+if page == "CRYPTO ANALYSIS":
+
+    st.set_page_config(page_title="Kripto Takip", page_icon="Chart", layout="wide")
+    grid_page(data_sources.SOURCES["coingecko"], "4Crypto Price Chart")
 
 
 ###################################################################################
@@ -221,402 +196,268 @@ if page == "CRYPTO ANALYSIS":
 
 
 if page == "BIST ANALYSIS":
-    
-   
+
     st.set_page_config(page_title="BIST 100 Takip", page_icon="Chart", layout="wide")
-    st.title("4BIST ANALYSIS")
+    grid_page(data_sources.SOURCES["yahoo"], "4BIST ANALYSIS")
+
+
+#########################################################################
+#########################################################################
+#########################################################################
+#########################################################################
 
-    # -------------------------------------------------
-    # GÜNCEL BIST 100 LİSTESİ (2025 - 100 Hisse)
-    # -------------------------------------------------
-    @st.cache_data(ttl=3600)
-    def get_bist100_stocks():
-        bist100 = [
-            "AKBNK.IS", "ASELS.IS", "BIMAS.IS", "EKGYO.IS", "EREGL.IS", "FROTO.IS",
-            "GARAN.IS", "ISCTR.IS", "KCHOL.IS", "PETKM.IS", "SAHOL.IS", "SISE.IS",
-            "TCELL.IS", "THYAO.IS", "TUPRS.IS", "VAKBN.IS", "YKBNK.IS", "ARCLK.IS",
-            "HALKB.IS", "KOZAL.IS", "PGSUS.IS", "SASA.IS", "TAVHL.IS", "TOASO.IS",
-            "TTKOM.IS", "VESBE.IS", "YATAS.IS", "ALARK.IS", "BRSAN.IS", "DOHOL.IS",
-            "ENJSA.IS", "GUBRF.IS", "HEKTS.IS", "KARSN.IS", "KRDMD.IS", "OTKAR.IS",
-            "OYAKC.IS", "QUAGR.IS", "SKBNK.IS", "TTRAK.IS", "ULKER.IS", "VESTL.IS",
-            "ZOREN.IS", "AEFES.IS", "AKSA.IS", "AKSGY.IS", "ALGYO.IS", "AYGAZ.IS",
-            "BAGFS.IS", "BLCYT.IS", "BRISA.IS", "CEMTS.IS", "CIMSA.IS", "DEVA.IS",
-            "DOAS.IS", "ECILC.IS", "EGEEN.IS", "ENKAI.IS", "ERBOS.IS", "FENER.IS",
-            "GENIL.IS", "GESAN.IS", "GOLTS.IS", "GOZDE.IS", "GSDHO.IS", "INDES.IS",
-            "ISGYO.IS", "ISMEN.IS", "KONTR.IS", "KORDS.IS", "KUTPO.IS", "MAVI.IS",
-            "MGROS.IS", "NTHOL.IS", "ODAS.IS", "PRKME.IS", "RALYH.IS", "SOKM.IS",
-            "TKFEN.IS", "TRKCM.IS", "TURSG.IS", "ZOREN.IS", "AFYON.IS", "ANHYT.IS",
-            "BAGFS.IS", "BLCYT.IS", "BRISA.IS", "CEMTS.IS", "CIMSA.IS", "DEVA.IS"
-        ]
-        # Tekrarları temizle
-        bist100 = sorted(set(bist100))
-        df = pd.DataFrame(bist100, columns=["symbol"])
-        df["name"] = df["symbol"].str.replace(".IS", "")
-        return df
-
-    with st.spinner("BIST 100 listesi yükleniyor…"):
-        stock_df = get_bist100_stocks()
+
+if page == "SINGLE ANALYSIS":
+
+    st.set_page_config(page_title="Hisse & Kripto Takip", page_icon="Chart", layout="wide")
+    st.title("1SINGLE ANALYSIS")
 
     # -------------------------------------------------
-    # Zaman aralığı (90 gün varsayılan)
+    # 1. Kaynak: Kripto, BIST 100 ya da yerel dosya
     # -------------------------------------------------
-    day_options = {"1 Gün": 1, "7 Gün": 7, "30 Gün": 30, "90 Gün": 90, "180 Gün": 180, "365 Gün": 365}
-    selected_day_label = st.selectbox("Zaman Aralığı:", list(day_options.keys()), index=3)
-    days = day_options[selected_day_label]
+    sources = {s.title: s for s in data_sources.SOURCES.values()}
+    source = sources[st.selectbox("Analiz Türü:", list(sources), index=0)]
 
     # -------------------------------------------------
-    # 4 hisse seçimi
+    # 2. Zaman aralığı (90 gün varsayılan)
     # -------------------------------------------------
-    col1, col2 = st.columns(2)
-    with col1:
-        stock_opts = stock_df["name"] + " (" + stock_df["symbol"].str.replace(".IS", "") + ")"
-        stock1_label = st.selectbox("1. Hisse", stock_opts, index=0)
-        stock1_symbol = stock_df.loc[stock_opts == stock1_label, "symbol"].values[0]
-        stock2_label = st.selectbox("2. Hisse", stock_opts, index=1)
-        stock2_symbol = stock_df.loc[stock_opts == stock2_label, "symbol"].values[0]
-    with col2:
-        stock3_label = st.selectbox("3. Hisse", stock_opts, index=2)
-        stock3_symbol = stock_df.loc[stock_opts == stock3_label, "symbol"].values[0]
-        stock4_label = st.selectbox("4. Hisse", stock_opts, index=3)
-        stock4_symbol = stock_df.loc[stock_opts == stock4_label, "symbol"].values[0]
+    days, downsample_on = select_days()
+    timeframe, candles = select_bars(source)
+    live_every = select_live(source, timeframe)
 
     # -------------------------------------------------
-    # yfinance ile veri çek (SMA200 için +200 gün fazladan)
+    # 3. Sembol seçimi (diğer sayfalarla aynı liste + önbellek)
     # -------------------------------------------------
-    @st.cache_data(ttl=300)
-    def get_stock_data(symbol, display_days):
+    symbols = get_symbol_list(source.name)
+    if not symbols.labels:
+        st.error(f"{source.title} listesi alınamadı.")
+        st.stop()
+    selected_label = st.selectbox(f"{source.item_label} Seç:", symbols.labels)
+    selected_id = symbols.ids[selected_label]
+
+    with st.spinner(f"{selected_label} verisi çekiliyor…"):
         try:
-            end_date = datetime.now()
-            # SMA200 için 200 gün fazladan veri al
-            start_date = end_date - timedelta(days=display_days + 210)
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(start=start_date, end=end_date, interval="1d")
-            if df.empty:
-                return None
-            df = df[['Close']].copy()
-            df.index = df.index.tz_localize(None)
-            # Sadece istenen günleri göster
-            df = df.tail(display_days)
-            return df
+            frames = data_sources.load_frames(source, [selected_id], days, timeframe=timeframe)
         except Exception as e:
-            st.error(f"Veri hatası ({symbol}): {e}")
-            return None
-
-    # -------------------------------------------------
-    # Grafik fonksiyonu (SMA200 her zaman görünür)
-    # -------------------------------------------------
-    def create_chart(symbol, label, display_days):
-        df = get_stock_data(symbol, display_days)
-        if df is None or df.empty:
-            fig = go.Figure()
-            fig.add_annotation(text="Veri alınamadı", xref="paper", yref="paper",
-                            x=0.5, y=0.5, showarrow=False, font=dict(size=14, color="red"))
-            fig.update_layout(template="plotly_dark", height=380, margin=dict(l=30, r=30, t=70, b=30))
-            return fig, None
-
-        # SMA'lar (200 gün geriye veri olduğu için her zaman hesaplanır)
-        df_full = get_stock_data(symbol, 400)  # SMA200 için yeterli veri
-        if df_full is not None and len(df_full) >= 200:
-            df["SMA20"] = ta.sma(df_full["Close"], length=20).tail(display_days)
-            df["SMA50"] = ta.sma(df_full["Close"], length=50).tail(display_days)
-            df["SMA100"] = ta.sma(df_full["Close"], length=100).tail(display_days)
-            df["SMA200"] = ta.sma(df_full["Close"], length=200).tail(display_days)
-        else:
-            # Yetersiz veri → sadece mevcut olanları hesapla
-            df["SMA20"] = ta.sma(df["Close"], length=20)
-            df["SMA50"] = ta.sma(df["Close"], length=50)
-            df["SMA100"] = ta.sma(df["Close"], length=100)
-
-        fig = go.Figure()
-
-        # Fiyat (turkuaz + dolgu)
-        fig.add_trace(go.Scatter(
-            x=df.index, y=df["Close"],
-            mode="lines", name="Fiyat (TL)",
-            line=dict(color="#00CED1", width=2),
-            fill="tozeroy", fillcolor="rgba(0, 206, 209, 0.05)"
-        ))
-
-        # SMA'lar
-        sma_cfg = [
-            ("SMA20", "#ADD8E6", "SMA20"),
-            ("SMA50", "#FFFF99", "SMA50"),
-            ("SMA100", "#FFA500", "SMA100"),
-            ("SMA200", "#FF0000", "SMA200")
-        ]
-        for col, colr, name in sma_cfg:
-            if col in df.columns and df[col].notna().any():
-                fig.add_trace(go.Scatter(
-                    x=df.index, y=df[col],
-                    mode="lines", name=name,
-                    line=dict(color=colr, width=1.5)
-                ))
-
-        # Layout (kripto ile %100 aynı)
-        fig.update_layout(
-            title=f'{label.split(" (")[0]} – {display_days} Gün',
-            title_font=dict(size=16, family="Arial", color="#FFFFFF"),
-            xaxis=dict(tickangle=45, tickfont=dict(size=10, color="#CCCCCC"),
-                    gridcolor="rgba(128,128,128,0.2)"),
-            yaxis=dict(tickfont=dict(size=10, color="#CCCCCC"),
-                    gridcolor="rgba(128,128,128,0.2)"),
-            hovermode="x unified", showlegend=True,
-            legend=dict(font=dict(size=9), bgcolor="rgba(0,0,0,0.5)"),
-            template="plotly_dark",
-            margin=dict(l=20, r=20, t=50, b=20),
-            height=380
-        )
-        current_price = df["Close"].iloc[-1]
-        return fig, current_price
+            metrics.error(f"page.{source.name}", e, selected_id)
+            frames = {selected_id: None}
+    if frames[selected_id] is None or frames[selected_id].empty:
+        st.error("Veri alınamadı.")
+        st.stop()
 
     # -------------------------------------------------
-    # 2×2 grafik düzeni
+    # 4. Grafik (Tüm ekranı kaplar)
     # -------------------------------------------------
-    st.markdown("---")
-
-    c1, c2 = st.columns(2)
-    with c1:
-        with st.spinner(f"{stock1_label} yükleniyor…"):
-            fig1, p1 = create_chart(stock1_symbol, stock1_label, days)
-            st.plotly_chart(fig1, use_container_width=True, key="chart_1")
-            st.metric(stock1_label.split(" (")[0], f"₺{p1:,.2f}" if p1 else "N/A")
+    render_chart("full", source, frames, selected_id, selected_label, days, downsample_on, live_every,
+                 "chart_single", "Güncel Fiyat", timeframe, candles)
 
-    with c2:
-        with st.spinner(f"{stock2_label} yükleniyor…"):
-            fig2, p2 = create_chart(stock2_symbol, stock2_label, days)
-            st.plotly_chart(fig2, use_container_width=True, key="chart_2")
-            st.metric(stock2_label.split(" (")[0], f"₺{p2:,.2f}" if p2 else "N/A")
 
-    c3, c4 = st.columns(2)
-    with c3:
-        with st.spinner(f"{stock3_label} yükleniyor…"):
-            fig3, p3 = create_chart(stock3_symbol, stock3_label, days)
-            st.plotly_chart(fig3, use_container_width=True, key="chart_3")
-            st.metric(stock3_label.split(" (")[0], f"₺{p3:,.2f}" if p3 else "N/A")
-
-    with c4:
-        with st.spinner(f"{stock4_label} yükleniyor…"):
-            fig4, p4 = create_chart(stock4_symbol, stock4_label, days)
-            st.plotly_chart(fig4, use_container_width=True, key="chart_4")
-            st.metric(stock4_label.split(" (")[0], f"₺{p4:,.2f}" if p4 else "N/A")
-
-
-
-
-#########################################################################
-#########################################################################
-#########################################################################
-#########################################################################
+###################################################################################
+###################################################################################
+###################################################################################
+###################################################################################
 
 
-if page == "SINGLE ANALYSIS":
+if page == "SCANNER":
 
+    st.set_page_config(page_title="Piyasa Tarayıcı", page_icon="Chart", layout="wide")
+    st.title("SCANNER")
 
     # -------------------------------------------------
-    # Session (CoinGecko için)
+    # Evren: Kripto Top N veya BIST 100
     # -------------------------------------------------
-    session = requests.Session()
-    session.headers.update({"User-Agent": "Mozilla/5.0 (Streamlit App)"})
+    universe_options = {"Kripto Top 50": 50, "Kripto Top 100": 100, "Kripto Top 250": 250, "BIST 100": None}
+    col1, col2 = st.columns(2)
+    with col1:
+        universe = st.selectbox("Evren:", list(universe_options.keys()), index=0)
+    with col2:
+        lookback = st.slider("Kesişim penceresi (bar):", min_value=1, max_value=30, value=5,
+                             help=f"SMA{indicators.CROSS_FAST} / SMA{indicators.CROSS_SLOW} kesişimleri son kaç barda aransın")
 
-    st.set_page_config(page_title="Hisse & Kripto Takip", page_icon="Chart", layout="wide")
-    st.title("1SINGLE ANALYSIS")
+    # Günlük barlar: SMA200 + kesişim penceresi için 365 gün + ısınma satırları
+    scan_days = 365
+    top_n = universe_options[universe]
 
     # -------------------------------------------------
-    # 1. Hisse mi, Kripto mu?
+    # Toplu veri → tek (T, S) matris → vektörel tarama
     # -------------------------------------------------
-    analysis_type = st.selectbox("Analiz Türü:", ["Kripto Para", "BIST 100 Hisse"], index=0)
+    source = data_sources.SOURCES["yahoo" if top_n is None else "coingecko"]
+    symbols = get_symbol_list(source.name)
+    if not symbols.labels:
+        st.error("Sembol listesi alınamadı.")
+        st.stop()
+    names = {symbols.ids[label]: label for label in symbols.labels[:top_n]}
+
+    t0 = time.perf_counter()
+    with st.spinner(f"{len(names)} {source.item_label.lower()} verisi toplu çekiliyor (ilk taramada depo dolar)…"):
+        with metrics.stage(f"load.{source.name}"):
+            histories = source.load_many(list(names), scan_days, indicators.WARMUP_ROWS)
+    t_load = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    with metrics.stage("scan"):
+        result = indicators.scan_frame(histories, lookback)
+    t_scan = time.perf_counter() - t1
+    if result.empty:
+        st.error("Veri alınamadı.")
+        st.stop()
 
-    # -------------------------------------------------
-    # 2. Zaman aralığı (90 gün varsayılan)
-    # -------------------------------------------------
-    day_options = {"1 Gün": 1, "7 Gün": 7, "30 Gün": 30, "90 Gün": 90, "180 Gün": 180, "365 Gün": 365}
-    selected_day_label = st.selectbox("Zaman Aralığı:", list(day_options.keys()), index=3)
-    days = day_options[selected_day_label]
+    result.insert(0, "Ad", [names.get(sym, sym) for sym in result.index])
+    missing = len(names) - len(result)
 
     # -------------------------------------------------
-    # 3. Veri Kaynağı: KRİPTO (CoinGecko)
+    # Özet + sıralanabilir tablo
     # -------------------------------------------------
-    @st.cache_data(ttl=3600)
-    def get_crypto_list():
-        url = "https://api.coingecko.com/api/v3/coins/markets"
-        params = {"vs_currency": "usd", "order": "market_cap_desc", "per_page": 250, "page": 1}
-        try:
-            time.sleep(1.2)
-            r = session.get(url, params=params, timeout=10)
-            if r.status_code != 200:
-                return pd.DataFrame()
-            data = r.json()
-            df = pd.DataFrame(data)
-            df = df[["id", "symbol", "name"]]
-            exclude = ["bridged", "wrapped", "vault", "token", "usd", "usdc", "usdt", "tether", "stake", "stable"]
-            mask = ~df["id"].str.contains("|".join(exclude), case=False, na=False)
-            df = df[mask].sort_values("name")
-            return df
-        except:
-            return pd.DataFrame()
-
-    @st.cache_data(ttl=300)
-    def get_crypto_data(coin_id, days):
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {"vs_currency": "usd", "days": days + 210}  # SMA200 için fazladan
-        try:
-            time.sleep(1.2)
-            r = session.get(url, params=params, timeout=10)
-            if r.status_code != 200:
-                return None
-            data = r.json()
-            if "prices" not in data or len(data["prices"]) == 0:
-                return None
-            return data
-        except:
-            return None
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Taranan", f"{len(result)}" + (f" / {len(names)}" if missing else ""))
+    m2.metric("Golden Cross", int((result["Kesişim"] == "Golden").sum()))
+    m3.metric("Death Cross", int((result["Kesişim"] == "Death").sum()))
 
-    # -------------------------------------------------
-    # 4. Veri Kaynağı: HİSSE (yfinance + BIST 100)
-    # -------------------------------------------------
-    @st.cache_data(ttl=3600)
-    def get_bist100_stocks():
-        bist100 = [
-            "AKBNK.IS", "ASELS.IS", "BIMAS.IS", "EKGYO.IS", "EREGL.IS", "FROTO.IS",
-            "GARAN.IS", "ISCTR.IS", "KCHOL.IS", "PETKM.IS", "SAHOL.IS", "SISE.IS",
-            "TCELL.IS", "THYAO.IS", "TUPRS.IS", "VAKBN.IS", "YKBNK.IS", "ARCLK.IS",
-            "HALKB.IS", "KOZAL.IS", "PGSUS.IS", "SASA.IS", "TAVHL.IS", "TOASO.IS",
-            "TTKOM.IS", "VESBE.IS", "YATAS.IS", "ALARK.IS", "BRSAN.IS", "DOHOL.IS",
-            "ENJSA.IS", "GUBRF.IS", "HEKTS.IS", "KARSN.IS", "KRDMD.IS", "OTKAR.IS",
-            "OYAKC.IS", "QUAGR.IS", "SKBNK.IS", "TTRAK.IS", "ULKER.IS", "VESTL.IS",
-            "ZOREN.IS", "AEFES.IS", "AKSA.IS", "AKSGY.IS", "ALGYO.IS", "AYGAZ.IS",
-            "BAGFS.IS", "BRISA.IS", "CEMTS.IS", "CIMSA.IS", "DEVA.IS", "DOAS.IS",
-            "ECILC.IS", "EGEEN.IS", "ENKAI.IS", "ERBOS.IS", "FENER.IS", "GENIL.IS",
-            "GESAN.IS", "GOLTS.IS", "GOZDE.IS", "GSDHO.IS", "INDES.IS", "ISGYO.IS",
-            "ISMEN.IS", "KONTR.IS", "KORDS.IS", "KUTPO.IS", "MAVI.IS", "MGROS.IS",
-            "NTHOL.IS", "ODAS.IS", "PRKME.IS", "RALYH.IS", "SOKM.IS", "TKFEN.IS",
-            "TRKCM.IS", "TURSG.IS"
-        ]
-        df = pd.DataFrame(sorted(set(bist100)), columns=["symbol"])
-        df["name"] = df["symbol"].str.replace(".IS", "")
-        return df
-
-    @st.cache_data(ttl=300)
-    def get_stock_data(symbol, display_days):
-        try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=display_days + 210)
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(start=start_date, end=end_date, interval="1d")
-            if df.empty:
-                return None
-            df = df[['Close']].copy()
-            df.index = df.index.tz_localize(None)
-            return df.tail(display_days)
-        except:
-            return None
+    only_cross = st.checkbox("Sadece kesişim olanlar", value=False)
+    view = result[result["Kesişim"] != ""] if only_cross else result
+    view = view.sort_values(["Kaç bar önce", f"SMA{indicators.CROSS_SLOW} %"], na_position="last")
 
-    # -------------------------------------------------
-    # 5. Seçim: Kripto mu, Hisse mi?
-    # -------------------------------------------------
-    if analysis_type == "Kripto Para":
-        crypto_df = get_crypto_list()
-        if crypto_df.empty:
-            st.error("Kripto listesi alınamadı.")
-            st.stop()
-        crypto_opts = crypto_df["name"] + " (" + crypto_df["symbol"].str.upper() + ")"
-        selected_crypto_label = st.selectbox("Kripto Para Seç:", crypto_opts)
-        selected_id = crypto_df.loc[crypto_opts == selected_crypto_label, "id"].values[0]
-
-        with st.spinner(f"{selected_crypto_label} verisi çekiliyor…"):
-            raw_data = get_crypto_data(selected_id, days)
-        if not raw_data:
-            st.error("Veri alınamadı.")
-            st.stop()
-
-        df = pd.DataFrame(raw_data["prices"], columns=["timestamp", "Close"])
-        df["timestamp"] = df["timestamp"].apply(lambda x: datetime.fromtimestamp(x / 1000))
-        df.set_index("timestamp", inplace=True)
-        currency = "USD"
-        price_label = f"${df['Close'].iloc[-1]:,.6f}"
-
-    else:  # BIST 100 Hisse
-        stock_df = get_bist100_stocks()
-        stock_opts = stock_df["name"] + " (" + stock_df["symbol"].str.replace(".IS", "") + ")"
-        selected_stock_label = st.selectbox("Hisse Seç:", stock_opts)
-        selected_symbol = stock_df.loc[stock_opts == selected_stock_label, "symbol"].values[0]
-
-        with st.spinner(f"{selected_stock_label} verisi çekiliyor…"):
-            df = get_stock_data(selected_symbol, days)
-        if df is None or df.empty:
-            st.error("Veri alınamadı.")
-            st.stop()
-        currency = "TL"
-        price_label = f"₺{df['Close'].iloc[-1]:,.2f}"
+    pct_cols = {c: st.column_config.NumberColumn(c, format="%.2f") for c in view.columns if c.endswith(" %")}
+    st.dataframe(
+        view,
+        use_container_width=True,
+        height=min(38 * (len(view) + 1), 800),
+        column_config={
+            "Close": st.column_config.NumberColumn("Fiyat", format="%.6g"),
+            "Son bar": st.column_config.DatetimeColumn("Son bar", format="YYYY-MM-DD"),
+            **pct_cols,
+        },
+    )
+    st.caption(f"Veri: {t_load:.2f} sn · Tarama: {t_scan * 1000:.0f} ms · {len(result)} sembol, günlük bar")
+    stale_badge(source, list(histories.values()))
+
+
+###################################################################################
+###################################################################################
+###################################################################################
+###################################################################################
 
-    # -------------------------------------------------
-    # 6. SMA'lar (her zaman 200 gün veri ile)
-    # -------------------------------------------------
-    try:
-        # Kripto: +210 gün veri alındı
-        # Hisse: get_stock_data zaten +210 gün aldı
-        full_df = df.copy()
-        if analysis_type == "Kripto Para":
-            full_raw = get_crypto_data(selected_id, 400)
-            if full_raw:
-                full_df = pd.DataFrame(full_raw["prices"], columns=["timestamp", "Close"])
-                full_df["timestamp"] = full_df["timestamp"].apply(lambda x: datetime.fromtimestamp(x / 1000))
-                full_df.set_index("timestamp", inplace=True)
-
-        df["SMA20"] = ta.sma(full_df["Close"], length=20).tail(days)
-        df["SMA50"] = ta.sma(full_df["Close"], length=50).tail(days)
-        df["SMA100"] = ta.sma(full_df["Close"], length=100).tail(days)
-        df["SMA200"] = ta.sma(full_df["Close"], length=200).tail(days)
-    except:
-        pass
+
+if page == "CORRELATION":
+
+    st.set_page_config(page_title="Korelasyon & Performans", page_icon="Chart", layout="wide")
+    st.title("CORRELATION")
 
     # -------------------------------------------------
-    # 7. Grafik (Tüm ekranı kaplar)
+    # Kaynak + sepet (en fazla 100 sembol)
     # -------------------------------------------------
-    fig = go.Figure()
-
-    # Fiyat (turkuaz + dolgu)
-    fig.add_trace(go.Scatter(
-        x=df.index, y=df["Close"],
-        mode="lines", name=f"Fiyat ({currency})",
-        line=dict(color="#00CED1", width=2),
-        fill="tozeroy", fillcolor="rgba(0, 206, 209, 0.05)"
-    ))
-
-    # SMA'lar
-    sma_cfg = [
-        ("SMA20", "#ADD8E6", "SMA20"),
-        ("SMA50", "#FFFF99", "SMA50"),
-        ("SMA100", "#FFA500", "SMA100"),
-        ("SMA200", "#FF0000", "SMA200")
-    ]
-    for col, colr, name in sma_cfg:
-        if col in df.columns and df[col].notna().any():
-            fig.add_trace(go.Scatter(
-                x=df.index, y=df[col],
-                mode="lines", name=name,
-                line=dict(color=colr, width=1.5)
-            ))
-
-    # Layout (tam ekran, karanlık tema)
-    fig.update_layout(
-        title=f"{selected_crypto_label if analysis_type == 'Kripto Para' else selected_stock_label} – Son {days} Gün",
-        title_font=dict(size=24, family="Arial", color="#FFFFFF"),
-        xaxis_title="Tarih", xaxis_title_font=dict(size=16, color="#CCCCCC"),
-        yaxis_title=f"Fiyat ({currency})", yaxis_title_font=dict(size=16, color="#CCCCCC"),
-        xaxis=dict(tickangle=45, tickfont=dict(size=12, color="#CCCCCC"),
-                gridcolor="rgba(128,128,128,0.2)"),
-        yaxis=dict(tickfont=dict(size=12, color="#CCCCCC"),
-                gridcolor="rgba(128,128,128,0.2)"),
-        hovermode="x unified", showlegend=True,
-        legend=dict(font=dict(size=12), bgcolor="rgba(0,0,0,0.5)"),
-        template="plotly_dark",
-        height=700,
-        margin=dict(l=60, r=60, t=100, b=60)
+    sources = {s.title: s for s in data_sources.SOURCES.values()}
+    col1, col2 = st.columns(2)
+    with col1:
+        source = sources[st.selectbox("Analiz Türü:", list(sources), index=0)]
+    symbols = get_symbol_list(source.name)
+    if not symbols.labels:
+        st.error(f"{source.title} listesi alınamadı.")
+        st.stop()
+    with col2:
+        basket_size = st.selectbox("Hazır sepet:", ["Seçim", "İlk 10", "İlk 25", "İlk 50", "İlk 100"], index=1,
+                                   help="Liste sırasıyla (kriptoda piyasa değeri) ilk N sembol; 'Seçim' ile elle seçilir.")
+    opts = symbols.labels
+    if basket_size == "Seçim":
+        basket = st.multiselect("Sepet:", opts, default=opts[:4], max_selections=100)
+    else:
+        basket = opts[:int(basket_size.split()[1])]
+    if len(basket) < 2:
+        st.info("Karşılaştırma için en az 2 sembol seçin.")
+        st.stop()
+    ids, names = symbols.ids, symbols.names
+    picks = [ids[label] for label in basket]
+    # Eksen / lejant için kısa ad: "Bitcoin (BTC)" → "BTC"
+    short = {ids[label]: label.split(" (")[-1].rstrip(")") for label in basket}
+
+    days, downsample_on = select_days()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        window = st.slider("Kayan pencere (bar):", min_value=10, max_value=120, value=30)
+    with col2:
+        bench_label = st.selectbox("Kıyas (beta):", ["Sepet ortalaması"] + basket, index=0)
+    with col3:
+        corr_last = st.radio("Korelasyon dönemi:", ["Son pencere", "Tüm aralık"], horizontal=True) == "Son pencere"
+    benchmark = ids.get(bench_label)
+
+    # -------------------------------------------------
+    # Toplu veri → ortak zaman ekseni → tek matriste getiri / korelasyon / beta
+    # -------------------------------------------------
+    t0 = time.perf_counter()
+    with st.spinner(f"{len(picks)} {source.item_label.lower()} verisi toplu çekiliyor…"):
+        with metrics.stage(f"load.{source.name}"):
+            histories = source.load_many(picks, days, window + 1)
+    t_load = time.perf_counter() - t0
+    loaded = {sym: df for sym, df in histories.items() if df is not None and not df.empty}
+    if len(loaded) < 2:
+        st.error("Veri alınamadı.")
+        st.stop()
+    start = min(source.window_start(df, days) for df in loaded.values())
+
+    t1 = time.perf_counter()
+    with metrics.stage("compare"):
+        res = indicators.compare_frame(loaded, start, window, benchmark, corr_last)
+    t_calc = time.perf_counter() - t1
+    labels = [short[sym] for sym in res["corr"].index]
+
+    # -------------------------------------------------
+    # Normalize performans + ısı haritası + kayan beta
+    # -------------------------------------------------
+    def thin(df):
+        # Çok sütunlu çizgilerde LTTB yerine ortak adım (tüm semboller aynı x noktalarında)
+        step = -(-len(df) // charts.FULL_WIDTH_POINTS)
+        return df.iloc[::step] if downsample_on and step > 1 else df
+
+    with metrics.stage("figure"):
+        fig_perf = charts.lines_figure(thin(res["performance"].rename(columns=short)),
+                                       f"Normalize Performans – Son {days} Gün", "Başlangıç = 100", reference=100)
+        period = f"son {window} bar" if corr_last else f"son {days} gün"
+        fig_corr = charts.heatmap_figure(res["corr"].to_numpy(), labels, f"Getiri Korelasyonu ({period})")
+        fig_beta = charts.lines_figure(thin(res["beta"].rename(columns=short)),
+                                       f"Kayan Beta ({window} bar, kıyas: {bench_label})", "Beta", reference=1)
+    st.plotly_chart(fig_perf, use_container_width=True, key="compare_perf")
+    st.plotly_chart(fig_corr, use_container_width=True, key="compare_corr")
+    st.plotly_chart(fig_beta, use_container_width=True, key="compare_beta")
+
+    summary = res["summary"]
+    summary.insert(0, "Ad", [names.get(sym, sym) for sym in summary.index])
+    st.dataframe(
+        summary.sort_values("Getiri %", ascending=False),
+        use_container_width=True,
+        height=min(38 * (len(summary) + 1), 600),
+        column_config={c: st.column_config.NumberColumn(c, format="%.2f") for c in summary.columns if c != "Ad"},
     )
+    missing = len(picks) - len(loaded)
+    st.caption(f"Veri: {t_load:.2f} sn · Hesap: {t_calc * 1000:.0f} ms · {len(loaded)} sembol × {len(res['performance'])} bar"
+               + (f" · {missing} sembol alınamadı" if missing else ""))
+    stale_badge(source, list(loaded.values()))
 
-    st.plotly_chart(fig, use_container_width=True)
 
-    # Güncel Fiyat
+###################################################################################
+###################################################################################
+
 
-    st.metric("Güncel Fiyat", price_label)
+# -------------------------------------------------
+# Debug paneli: bu rerun'ın aşamaları + önbellek / upstream sayaçları (process geneli)
+# -------------------------------------------------
+if debug_on:
+    with debug_box:
+        trace = metrics.current_trace()
+        if trace:
+            st.dataframe(
+                {"Aşama": [name for name, _, _ in trace],
+                 "Adet": [n for _, n, _ in trace],
+                 "ms": [round(total * 1000, 1) for _, _, total in trace]},
+                hide_index=True, use_container_width=True,
+            )
+        hits, misses = metrics.snapshot("cache_hits_total"), metrics.snapshot("cache_misses_total")
+        for labels in sorted(set(hits) | set(misses)):
+            h, m = hits.get(labels, 0), misses.get(labels, 0)
+            st.caption(f"Önbellek {dict(labels)['cache']}: {h}/{h + m} isabet")
+        upstream = metrics.snapshot("upstream_requests_total")
+        for labels, n in sorted(upstream.items()):
+            row = dict(labels)
+            st.caption(f"{row['upstream']} {row['endpoint']} → {row['status']}: {n}")
+        retries = sum(metrics.snapshot("upstream_retries_total").values())
+        if retries:
+            st.caption(f"Tekrar denemeler: {retries}")
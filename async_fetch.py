@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+
+import market_data
+import metrics
+from rate_limit import retry_delay
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# asyncio tabanlı CoinGecko backend (process başına tek)
+# -------------------------------------------------
+# Kendi thread'inde dönen bir event loop + havuzlu httpx.AsyncClient.
+# Aynı (coin_id, days) için eşzamanlı istekler tek HTTP çağrısını paylaşır
+# (single-flight). Bütçe, senkron session ile aynı TokenBucket'tan düşer.
+class AsyncCoinGeckoBackend:
+    def __init__(self, base_url=None, bucket=None, max_connections=8, timeout=15.0, max_retries=4):
+        self.base_url = base_url or market_data.COINGECKO_URL
+        self.bucket = bucket or market_data.session.bucket
+        self.max_retries = max_retries
+        self.coalesced = 0  # başka bir isteğe eklemlenen çağrı sayısı
+        self._inflight = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="coingecko-async", daemon=True)
+        self._thread.start()
+        self._client = self.run(self._open(max_connections, timeout))
+
+    async def _open(self, max_connections, timeout):
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=dict(market_data.session.headers),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+
+    def run(self, coro, timeout=None):
+        # Senkron (Streamlit) koddan çağırmak için köprü
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def close(self):
+        self.run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    async def _acquire(self):
+        t0 = None
+        while (wait := self.bucket.try_acquire()) > 0:
+            t0 = t0 or time.perf_counter()
+            await asyncio.sleep(wait)
+        if t0 is not None:
+            metrics.observe("ratelimit_wait_seconds", time.perf_counter() - t0, help="Jeton için beklenen süre (sn)")
+
+    async def get(self, path, params=None, endpoint="other"):
+        # Yeniden deneme kararı senkron session'la ortak (rate_limit.retry_delay)
+        for attempt in range(self.max_retries + 1):
+            await self._acquire()
+            t0 = time.perf_counter()
+            r = error = None
+            try:
+                r = await self._client.get(path, params=params)
+            except httpx.HTTPError as e:
+                error = e
+            delay = retry_delay(self.bucket, "coingecko", endpoint, attempt, self.max_retries,
+                                time.perf_counter() - t0, r, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return r
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def _fetch_chunk(self, coin_id, from_ts, to_ts):
+        params = {"vs_currency": "usd", "from": from_ts // 1000, "to": to_ts // 1000}
+        r = await self.get(f"/coins/{coin_id}/market_chart/range", params, endpoint="market_chart/range")
+        if r.status_code != 200:
+            log.warning("CoinGecko %s: HTTP %s", coin_id, r.status_code)
+            return None
+        # Boş DataFrame = aralıkta veri yok; None = başarısız (kapsam ilerlemez)
+        return market_data.parse_market_chart(r.content)
+
+    async def _load(self, coin_id, days, warmup_rows, interval, max_age):
+        # Depo erişimi (SQLite) loop'u bloklamasın diye thread'de
+        plan = await asyncio.to_thread(market_data.crypto_plan, coin_id, days, warmup_rows, max_age, interval)
+        results = await asyncio.gather(
+            *(self._fetch_chunk(coin_id, f, t) for f, t in plan.chunks), return_exceptions=True
+        )
+        for i, res in enumerate(results):
+            if isinstance(res, Exception):
+                metrics.error("coingecko.chunk", res, coin_id)
+                results[i] = None
+        if plan.chunks:
+            await asyncio.to_thread(market_data.store_crypto_chunks, plan, results)
+        return await asyncio.to_thread(market_data.read_crypto, plan)
+
+    async def load(self, coin_id, days, warmup_rows=0, interval=None, max_age=market_data.REFRESH_SECONDS):
+        key = (coin_id, days, warmup_rows, interval, max_age)
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._load(coin_id, days, warmup_rows, interval, max_age))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            metrics.count("coalesced_requests_total", help="Süren bir isteğe eklemlenen yüklemeler")
+        # shield: bekleyenlerden biri iptal olsa da ortak istek sürer
+        return await asyncio.shield(task)
+
+    async def load_many(self, coin_ids, days, warmup_rows=0, interval=None, max_age=market_data.REFRESH_SECONDS):
+        results = await asyncio.gather(
+            *(self.load(cid, days, warmup_rows, interval, max_age) for cid in coin_ids), return_exceptions=True
+        )
+        out = {}
+        for cid, res in zip(coin_ids, results):
+            if isinstance(res, Exception):
+                metrics.error("coingecko.load", res, cid)
+                res = None
+            out[cid] = res
+        return out
+
+    def load_crypto_histories(self, coin_ids, days, warmup_rows=0, interval=None, max_age=market_data.REFRESH_SECONDS):
+        return self.run(self.load_many(list(coin_ids), days, warmup_rows, interval, max_age))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = AsyncCoinGeckoBackend()
+        return _backend
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from market_data import DAY_MS
+
+
+# -------------------------------------------------
+# Bar (mum) katmanı: depodaki en ince seriden yerel yeniden örnekleme
+# -------------------------------------------------
+# 4 saat / 1 gün / 1 hafta barları ayrı bir çekim gerektirmez; depoda zaten
+# olan seriden (kripto: 5 dk / saatlik / günlük, BIST: günlük) tek vektörel
+# resample ile kurulur. Kripto serilerinde sadece Close saklandığından
+# Open/High/Low alt barların kapanışlarından türetilir.
+TIMEFRAMES = {"4 Saat": "4h", "1 Gün": "1D", "1 Hafta": "1W"}
+TIMEFRAME_MS = {"4h": 4 * 3_600_000, "1D": DAY_MS, "1W": 7 * DAY_MS}
+# Haftalık barlar pazartesi 00:00 UTC'de başlar ve o günle etiketlenir
+_RULES = {"4h": dict(rule="4h"), "1D": dict(rule="1D"), "1W": dict(rule="W-MON", label="left", closed="left")}
+
+
+def resample_ohlc(df, timeframe):
+    # df: DatetimeIndex + en az "Close" → Open/High/Low/Close barları (boş barlar atılır)
+    close = df["Close"]
+    frame = pd.DataFrame({
+        "Open": df["Open"].fillna(close) if "Open" in df else close,
+        "High": df["High"].fillna(close) if "High" in df else close,
+        "Low": df["Low"].fillna(close) if "Low" in df else close,
+        "Close": close,
+    })
+    out = frame.resample(**_RULES[timeframe]).agg({"Open": "first", "High": "max", "Low": "min", "Close": "last"})
+    return out[out["Close"].notna()]
@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# -------------------------------------------------
+# Eşzamanlı oturumlar → tek HTTP çağrısı (single-flight) ölçümü
+# python benchmarks/coalescing.py [oturum_sayısı] [gecikme_sn]
+# -------------------------------------------------
+sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+
+from coingecko_stub import serve  # noqa: E402
+
+server, base_url = serve(latency=latency)
+os.environ["COINGECKO_URL"] = base_url
+os.environ["COINGECKO_RATE_PER_MIN"] = "6000"
+os.environ["PRICE_STORE_PATH"] = os.path.join(tempfile.mkdtemp(), "prices.sqlite")
+
+import async_fetch  # noqa: E402
+import market_data  # noqa: E402
+
+COINS = ["bitcoin", "ethereum", "solana", "ripple"]
+
+
+def main():
+    backend = async_fetch.get_backend()
+
+    # Her "oturum" CRYPTO sayfasındaki gibi 4 coin'i aynı anda ister
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda _: backend.load_crypto_histories(COINS, 90, 200), range(sessions)))
+    cold = time.perf_counter() - t0
+    hits = sum(server.RequestHandlerClass.hits.values())
+    assert all(r[c] is not None for r in results for c in COINS)
+
+    t0 = time.perf_counter()
+    backend.load_crypto_histories(COINS, 90, 200)
+    warm = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for c in COINS:
+        market_data.load_crypto_history(c, 30)
+    sync_slice = time.perf_counter() - t0
+
+    print(f"oturum: {sessions}, istek başı gecikme: {latency:.2f} sn")
+    print(f"soğuk: {cold:.2f} sn, HTTP çağrısı: {hits} (oturum × coin = {sessions * len(COINS)}), "
+          f"paylaşılan: {backend.coalesced}")
+    print(f"sıcak (depodan): {warm * 1000:.1f} ms, 30 gün dilimi (senkron): {sync_slice * 1000:.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+
+# -------------------------------------------------
+# Yerel CoinGecko stub sunucusu
+# -------------------------------------------------
+# Kayıtlı yanıtları (fixtures/coingecko/*.json) tekrar oynatır; kayıt yoksa
+# coin id'sinden türetilen deterministik seri üretir. /simple/price her zaman
+# sahte (saate bağlı) fiyat döner: canlı mod yerel olarak denenebilir.
+# fixtures/ depoya eklenmez (gerçek piyasa verisi): kaydedilmediyse tüm yanıtlar
+# sentetiktir; kaçının kayıttan geldiği `replayed` sayacında.
+#
+#   python benchmarks/coingecko_stub.py --port 8765 --latency 0.2
+#   COINGECKO_URL=http://127.0.0.1:8765/api/v3 streamlit run app_limitsiz2.py
+#
+# --record: istekleri gerçek API'ye iletip yanıtları fixtures altına yazar.
+# --error-rate 0.1: isteklerin ~%10'una Retry-After'lı 429 (tohumlu, tekrarlanabilir).
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "coingecko")
+UPSTREAM = "https://api.coingecko.com/api/v3"
+
+
+def fixture_name(path, query):
+    # /coins/bitcoin/market_chart/range → coins_bitcoin_market_chart_range
+    name = path.replace("/api/v3", "").strip("/").replace("/", "_")
+    if "page" in query:
+        name += f"_page{query['page'][0]}"
+    return os.path.join(FIXTURES, name + ".json")
+
+
+def synthetic_chart(coin_id, from_s, to_s, now=None):
+    # CoinGecko /range çözünürlüğü: 5 dk sadece şimdiye kadarki son 1 gün, ≤90 gün saatlik
+    span = to_s - from_s
+    recent = to_s >= (now or time.time()) - 3_600
+    step = 300 if span <= 86_400 and recent else 3_600 if span <= 90 * 86_400 else 86_400
+    ts = np.arange(from_s - from_s % step + step, to_s + 1, step, dtype="int64")
+    # Mutlak zamana bağlı yürüyüş: aynı an her istekte aynı fiyat
+    seed = zlib.crc32(coin_id.encode())
+    price = 100 + (seed % 1000) + 10 * np.sin(ts / 86_400 + seed)
+    pts = [[int(t) * 1000, float(p)] for t, p in zip(ts, price)]
+    return {"prices": pts, "market_caps": pts, "total_volumes": pts}
+
+
+def synthetic_markets(page, per_page=250):
+    start = (page - 1) * per_page
+    return [{"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}", "current_price": 1.0 + i,
+             "market_cap_rank": i + 1} for i in range(start, start + per_page)]
+
+
+def synthetic_simple_price(coin_ids, now=None):
+    # Canlı mod için sahte fiyat akışı: synthetic_chart ile aynı eğri + dakikalık dalga
+    now = int(now or time.time())
+    out = {}
+    for coin_id in coin_ids:
+        seed = zlib.crc32(coin_id.encode())
+        price = 100 + (seed % 1000) + 10 * np.sin(now / 86_400 + seed) + 0.5 * np.sin(now / 60 + seed)
+        out[coin_id] = {"usd": float(price), "last_updated_at": now}
+    return out
+
+
+def slice_chart(payload, from_s, to_s):
+    out = {}
+    for field, pts in payload.items():
+        out[field] = [p for p in pts if from_s * 1000 <= p[0] <= to_s * 1000]
+    return out
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    record = False
+    error_rate = 0.0
+    retry_after = 1.0
+    rng = random.Random(0)
+    hits = {}
+    errors = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/_stats":
+            return self._send(200, dict(self.hits, _429=type(self).errors))
+        with self.lock:
+            self.hits[url.path] = self.hits.get(url.path, 0) + 1
+            throttled = self.rng.random() < self.error_rate
+            if throttled:
+                type(self).errors += 1
+        time.sleep(self.latency)
+        if throttled:
+            return self._send(429, {"status": {"error_code": 429, "error_message": "rate limited"}},
+                              {"Retry-After": f"{self.retry_after:g}"})
+
+        if self.record:
+            r = requests.get(UPSTREAM + url.path.replace("/api/v3", ""), params=url.query, timeout=30)
+            if r.status_code == 200:
+                os.makedirs(FIXTURES, exist_ok=True)
+                with open(fixture_name(url.path, query), "w") as f:
+                    f.write(r.text)
+            return self._send(r.status_code, r.json())
+
+        path = fixture_name(url.path, query)
+        recorded = None
+        if os.path.exists(path):
+            with open(path) as f:
+                recorded = json.load(f)
+            with self.lock:
+                type(self).replayed += 1
+
+        if url.path.endswith("/market_chart/range"):
+            from_s, to_s = int(query["from"][0]), int(query["to"][0])
+            if recorded is not None:
+                return self._send(200, slice_chart(recorded, from_s, to_s))
+            coin_id = url.path.split("/")[-3]
+            return self._send(200, synthetic_chart(coin_id, from_s, to_s))
+        if url.path.endswith("/coins/markets"):
+            page = int(query.get("page", ["1"])[0])
+            return self._send(200, recorded if recorded is not None else synthetic_markets(page))
+        if url.path.endswith("/simple/price"):
+            ids = query.get("ids", [""])[0].split(",")
+            return self._send(200, synthetic_simple_price([i for i in ids if i]))
+        self._send(404, {"error": "not found"})
+
+
+def serve(port=0, latency=0.0, record=False, error_rate=0.0, retry_after=1.0, seed=0):
+    # Arka planda başlatır, (server, base_url) döner
+    handler = type("Handler", (StubHandler,), {
+        "latency": latency, "record": record, "error_rate": error_rate, "retry_after": retry_after,
+        "rng": random.Random(seed), "hits": {}, "errors": 0, "replayed": 0,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/api/v3"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel CoinGecko stub sunucusu")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="istek başına gecikme (sn)")
+    parser.add_argument("--record", action="store_true", help="gerçek API'den kaydet")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 dönecek istek oranı")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 yanıtındaki Retry-After (sn)")
+    args = parser.parse_args()
+    server, base_url = serve(args.port, args.latency, args.record, args.error_rate, args.retry_after)
+    print(f"COINGECKO_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
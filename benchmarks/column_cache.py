@@ -0,0 +1,67 @@
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+tmp = tempfile.mkdtemp()
+os.environ.setdefault("PRICE_STORE_PATH", os.path.join(tmp, "prices.sqlite"))
+os.environ.setdefault("PRICE_CACHE_MB", "4")
+os.environ.setdefault("PREFETCH", "0")
+# Ölçülen process içi bütçe: mmap'li seriler (process'ler arası ortak) kapalı
+os.environ.setdefault("HISTORY_MMAP", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import market_data  # noqa: E402
+
+
+# -------------------------------------------------
+# Bellek: st.cache_data kopyası (pickle'lanmış DataFrame) ↔ ColumnCache
+# ve okuma süresi: SQLite ↔ önbellek. Bütçe PRICE_CACHE_MB (varsayılan 4 MB).
+# python benchmarks/column_cache.py
+# -------------------------------------------------
+SYMBOLS = 400
+ROWS = 2_400  # 100 gün saatlik
+
+
+def fill():
+    now = market_data._now_ms()
+    ts = now - np.arange(ROWS)[::-1] * 3_600_000
+    for k in range(SYMBOLS):
+        close = 100 + np.cumsum(np.random.default_rng(k).normal(size=ROWS))
+        df = market_data._frame(ts, close)
+        market_data.store.write("bench", f"s{k}", "1h", df, int(ts[0]))
+    return int(ts[0])
+
+
+def main():
+    start_ts = fill()
+    pickled = 0
+    t0 = time.perf_counter()
+    for k in range(SYMBOLS):
+        # Eski yol: her seri için tüm OHLCV DataFrame'i, st.cache_data pickle kopyası
+        pickled += len(pickle.dumps(market_data.store.read("bench", f"s{k}", "1h", start_ts)))
+    t_store = time.perf_counter() - t0
+
+    cache = market_data.price_cache
+    for k in range(SYMBOLS):
+        market_data.read_close("bench", f"s{k}", "1h", start_ts)
+    # Sıcak okuma: son 100 sembol (bütçeye sığan kısım)
+    t0 = time.perf_counter()
+    for k in range(SYMBOLS - 100, SYMBOLS):
+        market_data.read_close("bench", f"s{k}", "1h", start_ts)
+    t_cache = (time.perf_counter() - t0) * SYMBOLS / 100
+
+    st = cache.stats()
+    print(f"{SYMBOLS} seri × {ROWS} bar")
+    print(f"pickle'lanmış DataFrame toplamı : {pickled / 2**20:8.1f} MB (sınırsız)")
+    print(f"ColumnCache                     : {st['nbytes'] / 2**20:8.1f} MB / {st['max_bytes'] / 2**20:.1f} MB, "
+          f"{st['entries']} kayıt")
+    print(f"sayaçlar                        : hit={st['hits']} miss={st['misses']} evict={st['evictions']}")
+    print(f"{SYMBOLS} okuma: SQLite {t_store * 1000:.0f} ms, önbellek {t_cache * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
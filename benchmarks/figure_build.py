@@ -0,0 +1,76 @@
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import charts  # noqa: E402
+
+
+# -------------------------------------------------
+# Grafik başına figür kurma süresi: eski go.Scatter + update_layout ↔ şablon
+# python benchmarks/figure_build.py
+# -------------------------------------------------
+def make_frame(n):
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=n))
+    df = pd.DataFrame({"Close": close}, index=pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC"))
+    for w in (20, 50, 100, 200):
+        df[f"SMA{w}"] = df["Close"].rolling(w).mean()
+    return df
+
+
+def legacy_figure(df, title):
+    # Sayfalardaki eski kopya (her grafikte doğrulama + plotly_dark çözümlemesi)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df.index, y=df["Close"],
+        mode="lines", name="Fiyat",
+        line=dict(color="#00CED1", width=2),
+        fill="tozeroy", fillcolor="rgba(0, 206, 209, 0.05)"
+    ))
+    sma_cfg = [("SMA20", "#ADD8E6", "SMA20"), ("SMA50", "#FFFF99", "SMA50"),
+               ("SMA100", "#FFA500", "SMA100"), ("SMA200", "#FF0000", "SMA200")]
+    for col, colr, name in sma_cfg:
+        if col in df.columns and df[col].notna().any():
+            fig.add_trace(go.Scatter(x=df.index, y=df[col], mode="lines", name=name,
+                                     line=dict(color=colr, width=1.5)))
+    fig.update_layout(
+        title=title,
+        title_font=dict(size=16, family="Arial", color="#FFFFFF"),
+        xaxis=dict(tickangle=45, tickfont=dict(size=10, color="#CCCCCC"),
+                   gridcolor="rgba(128,128,128,0.2)"),
+        yaxis=dict(tickfont=dict(size=10, color="#CCCCCC"),
+                   gridcolor="rgba(128,128,128,0.2)"),
+        hovermode="x unified", showlegend=True,
+        legend=dict(font=dict(size=9), bgcolor="rgba(0,0,0,0.5)"),
+        template="plotly_dark",
+        margin=dict(l=20, r=20, t=50, b=20),
+        height=380
+    )
+    return fig
+
+
+def to_spec(fig):
+    # st.plotly_chart'ın yaptığı dönüşüm
+    return pio.to_json(fig.to_dict(), validate=False)
+
+
+def main():
+    charts.layout_template("half")  # şablon ısınması (sayfa başına bir kez)
+    print(f"{'nokta':>6} {'eski (ms)':>10} {'şablon (ms)':>12} {'hızlanma':>9} {'eski+json':>10} {'şablon+json':>12}")
+    for n in (800, 2_000, 10_000):
+        df = make_frame(n)
+        old = min(timeit.repeat(lambda: legacy_figure(df, "BTC – 90 Gün"), number=5, repeat=3)) / 5 * 1000
+        new = min(timeit.repeat(lambda: charts.price_figure("half", df, "BTC – 90 Gün"), number=5, repeat=3)) / 5 * 1000
+        old_j = min(timeit.repeat(lambda: to_spec(legacy_figure(df, "x")), number=3, repeat=3)) / 3 * 1000
+        new_j = min(timeit.repeat(lambda: to_spec(charts.price_figure("half", df, "x")), number=3, repeat=3)) / 3 * 1000
+        print(f"{n:>6} {old:>10.2f} {new:>12.2f} {old / new:>8.1f}x {old_j:>10.2f} {new_j:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+# -------------------------------------------------
+# Çok process'li okuma: process başına özel bellek, mmap ↔ process içi kopya
+# python benchmarks/history_mmap.py   (Linux: /proc/self/smaps_rollup)
+# -------------------------------------------------
+SYMBOLS = 100
+ROWS = 8_760  # 1 yıl saatlik
+WORKERS = 4
+
+WORKER = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+import market_data
+
+def private_kb():
+    with open("/proc/self/smaps_rollup") as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith(("Private_Clean", "Private_Dirty")))
+
+before = private_kb()
+t0 = time.perf_counter()
+for k in range({symbols}):
+    market_data.read_close("bench", f"s{{k}}", "1h", 0)
+elapsed = time.perf_counter() - t0
+# Sayfa render'ı gibi: DataFrame geçici, kalıcı olan sadece önbellek
+for k in range({symbols}):
+    market_data.read_close("bench", f"s{{k}}", "1h", 0)
+print(private_kb() - before, elapsed)
+"""
+
+
+def fill(env):
+    os.environ.update(env)
+    import market_data
+    now = market_data._now_ms()
+    ts = now - np.arange(ROWS)[::-1] * 3_600_000
+    for k in range(SYMBOLS):
+        close = 100 + np.cumsum(np.random.default_rng(k).normal(size=ROWS))
+        market_data.store.write("bench", f"s{k}", "1h", market_data._frame(ts, close), int(ts[0]))
+
+
+def run(env, mmap):
+    env = dict(env, HISTORY_MMAP="1" if mmap else "0")
+    code = WORKER.format(root=ROOT, symbols=SYMBOLS)
+    procs = [subprocess.Popen([sys.executable, "-c", code], env=env, stdout=subprocess.PIPE, text=True)
+             for _ in range(WORKERS)]
+    out = [p.communicate()[0].split() for p in procs]
+    return [int(kb) for kb, _ in out], [float(t) for _, t in out]
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    env = dict(os.environ, PRICE_STORE_PATH=os.path.join(tmp, "prices.sqlite"),
+               HISTORY_DIR=os.path.join(tmp, "history"), PRICE_CACHE_MB="1024", PREFETCH="0")
+    fill(env)
+    run(env, True)  # mmap dosyalarını üret
+    time.sleep(0.1)
+    print(f"{WORKERS} process × {SYMBOLS} seri × {ROWS} bar")
+    for label, mmap in (("process içi kopya", False), ("mmap", True)):
+        kb, t = run(env, mmap)
+        print(f"{label:>18}: özel bellek/process ≈ {np.mean(kb) / 1024:6.1f} MB, ilk okuma {np.mean(t) * 1000:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import charts  # noqa: E402
+import indicators  # noqa: E402
+
+
+# -------------------------------------------------
+# Canlı mod: tam yeniden hesap ↔ artımlı tick (SMA + seyreltme + figür)
+# python benchmarks/live_tick.py
+# -------------------------------------------------
+STEP = 3_600_000
+
+
+def make_frame(n):
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(size=n))
+    index = pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC", name="timestamp")
+    df = pd.DataFrame({"Close": close}, index=index)
+    df.attrs["series_key"] = ("bench", f"n{n}", "1h")
+    return df
+
+
+def full_smas(df, price):
+    # Eski yol: tüm seri + yeni nokta → SMA'lar baştan
+    last = df.index[-1] + pd.Timedelta(hours=1)
+    df = pd.concat([df, pd.DataFrame({"Close": [price]}, index=[last])])
+    return indicators.sma_frame(df)
+
+
+def tick_smas(key, ts, price):
+    indicators.live_tick(key, ts, price, STEP)
+    return indicators.live_frame(key)
+
+
+def figure(out):
+    return charts.price_figure("half", charts.downsample(out, charts.HALF_WIDTH_POINTS), "x")
+
+
+def best(fn, number=5):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    charts.layout_template("half")
+    print(f"{'bar':>7} {'SMA tam':>9} {'SMA tick':>9} {'hızlanma':>9} {'+figür tam':>11} {'+figür tick':>12}  (ms)")
+    for n in (2_000, 20_000, 200_000):
+        df = make_frame(n)
+        key = df.attrs["series_key"]
+        indicators.cached_sma_frame(df)
+        ts = [int(df.index[-1].value // 1_000_000)]
+
+        def tick():
+            ts[0] += STEP
+            return tick_smas(key, ts[0], 100.0)
+
+        full = best(lambda: full_smas(df, 100.0))
+        inc = best(tick)
+        full_fig = best(lambda: figure(full_smas(df, 100.0)))
+        inc_fig = best(lambda: figure(tick()))
+        print(f"{n:>7} {full:>9.2f} {inc:>9.2f} {full / inc:>8.1f}x {full_fig:>11.2f} {inc_fig:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
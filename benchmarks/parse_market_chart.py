@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_data import parse_market_chart  # noqa: E402
+
+
+# -------------------------------------------------
+# Eski satır satır apply ↔ vektörel parse karşılaştırması
+# python benchmarks/parse_market_chart.py
+# -------------------------------------------------
+def make_payload(n):
+    # 5 dakikalık CoinGecko benzeri ham yanıt gövdesi
+    ts = 1_700_000_000_000 + np.arange(n, dtype="int64") * 300_000
+    price = 30_000 + np.cumsum(np.random.default_rng(0).normal(size=n))
+    pts = [[int(t), float(p)] for t, p in zip(ts, price)]
+    return json.dumps({"prices": pts, "market_caps": pts, "total_volumes": pts}).encode()
+
+
+def parse_apply(body):
+    # Eski yol: r.json() + satır başına datetime.fromtimestamp
+    payload = json.loads(body)
+    df = pd.DataFrame(payload["prices"], columns=["timestamp", "Close"])
+    df["timestamp"] = df["timestamp"].apply(lambda x: datetime.fromtimestamp(x / 1000))
+    df.set_index("timestamp", inplace=True)
+    return df
+
+
+def main():
+    print(f"{'nokta':>8} {'apply (ms)':>12} {'vektörel (ms)':>14} {'hızlanma':>9}")
+    for n in (288, 2_000, 14_000, 100_000):
+        body = make_payload(n)
+        assert np.allclose(parse_market_chart(body)["Close"], parse_apply(body)["Close"])
+        repeat = max(3, 20_000 // n)
+        old = min(timeit.repeat(lambda: parse_apply(body), number=1, repeat=repeat)) * 1000
+        new = min(timeit.repeat(lambda: parse_market_chart(body), number=1, repeat=repeat)) * 1000
+        print(f"{n:>8} {old:>12.2f} {new:>14.2f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
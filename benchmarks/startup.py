@@ -0,0 +1,132 @@
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(ROOT, "app_limitsiz2.py")
+
+
+# -------------------------------------------------
+# Soğuk başlangıç: import maliyeti (python -X importtime) + ilk çizim
+# -------------------------------------------------
+# Her ölçüm yeni bir interpreter'da (yeni pod gibi). Streamlit sunucu
+# process'inde zaten yüklü olduğundan taban olarak ayrı sayılır; rapordaki
+# "uygulama" satırı betiğin kendi import'larının streamlit üstüne eklediği süre.
+# Sayfa satırları o sayfanın ilk kez istendiğinde ek olarak yüklediklerini gösterir.
+#
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --repeat 5 --top 15
+PAGE_IMPORTS = {
+    "CRYPTO": ["async_fetch"],     # httpx + event loop
+    "BIST": ["yfinance"],          # market_data._yf()
+}
+HEAVY = ["yfinance", "httpx", "requests", "plotly.graph_objects"]
+
+FIRST_PAINT = """
+import os, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r}); sys.path.insert(1, {bench!r})
+os.environ.update(PRICE_STORE_PATH={store!r}, HISTORY_DIR={history!r}, PREFETCH="0", METRICS_PORT="0",
+                  COINGECKO_RATE_PER_MIN="6000")
+from coingecko_stub import serve
+server, url = serve()
+os.environ["COINGECKO_URL"] = url
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=300)
+at.run()
+t2 = time.perf_counter()
+assert not at.exception, at.exception[0].value
+print(t1 - t0, t2 - t1, "yfinance" in sys.modules)
+"""
+
+
+def app_imports():
+    # Betiğin en üst düzey import'ları (streamlit hariç), dosyadaki sırayla
+    tree = ast.parse(open(APP, encoding="utf-8").read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return [n for n in names if n.split(".")[0] != "streamlit"]
+
+
+def importtime(modules):
+    # → ([(seviye, modül, self µs, kümülatif µs)] streamlit'ten sonra yüklenenler, sonda yüklü ağır paketler)
+    code = ("import sys\nimport streamlit\n" + "".join(f"import {m}\n" for m in modules)
+            + f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))\n")
+    r = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                       capture_output=True, text=True, check=True)
+    rows, after = [], False
+    for line in r.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip())) // 2
+        if after:
+            rows.append((level, name.strip(), int(self_us), int(cum_us)))
+        elif level == 0 and name.strip() == "streamlit":
+            after = True
+    return rows, r.stdout.split()
+
+
+def top_level_ms(rows, only=None, exclude=()):
+    # Üst düzey import'ların kümülatif toplamı; iç içe olanlar zaten dahil
+    return sum(cum for level, name, _, cum in rows
+               if level == 0 and (only is None or name in only) and name not in exclude) / 1000
+
+
+def first_paint(repeat):
+    tmp = tempfile.mkdtemp(prefix="startup-")
+    runs = []
+    for i in range(repeat):
+        code = FIRST_PAINT.format(root=ROOT, bench=BENCH, app=APP, store=os.path.join(tmp, str(i), "p.sqlite"),
+                                  history=os.path.join(tmp, str(i), "history"))
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+        if out.returncode:
+            raise RuntimeError(out.stderr[-2000:])
+        boot, run, yf_loaded = out.stdout.split()
+        runs.append((float(boot), float(run), yf_loaded == "True"))
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soğuk başlangıç: import süreleri + varsayılan sayfanın ilk çizimi")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="en ağır N modül (kümülatif)")
+    args = parser.parse_args()
+
+    modules = app_imports()
+    print(f"Betik import'ları: {', '.join(modules)}\n")
+
+    runs = [importtime(modules) for _ in range(args.repeat)]
+    print(f"{'yükleme':<28} {'medyan (ms)':>12}")
+    print("-" * 41)
+    print(f"{'uygulama (streamlit üstü)':<28} {statistics.median(top_level_ms(r) for r, _ in runs):>12.1f}")
+    for page, extra in PAGE_IMPORTS.items():
+        # Aynı interpreter'da betik import'larından sonra: sadece sayfanın eklediği
+        page_runs = [importtime(modules + extra)[0] for _ in range(args.repeat)]
+        print(f"{'+ ' + page + ' ilk istek':<28} {statistics.median(top_level_ms(r, only=extra) for r in page_runs):>12.1f}")
+
+    rows, loaded = runs[-1]
+    print("\nAğır paketler başlangıçta:", ", ".join(f"{m} {'yüklü' if m in loaded else '—'}" for m in HEAVY))
+    print(f"\nEn ağır {args.top} modül (kümülatif, son çalıştırma):")
+    for level, name, _, cum in sorted(rows, key=lambda r: -r[3])[:args.top]:
+        print(f"  {cum / 1000:>8.1f} ms  {'  ' * level}{name}")
+
+    paints = first_paint(args.repeat)
+    boot = statistics.median(p[0] for p in paints)
+    run = statistics.median(p[1] for p in paints)
+    print(f"\nİlk çizim (varsayılan sayfa, yerel stub): interpreter + streamlit {boot * 1000:.0f} ms, "
+          f"betiğin ilk çalışması {run * 1000:.0f} ms · yfinance yüklendi: {paints[-1][2]}")
+
+
+if __name__ == "__main__":
+    main()
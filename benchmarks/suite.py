@@ -0,0 +1,72 @@
+import argparse
+import glob
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# -------------------------------------------------
+# Uçtan uca benchmark takımı (ağ yok, tekrarlanabilir)
+# -------------------------------------------------
+# Ölçümler tests/bench_*.py içinde, pytest-benchmark'ın benchmark fixture'ı ile:
+#   bench_pages    her sayfa soğuk (boş depo + boş önbellekler) ve sıcak çizim (AppTest)
+#   bench_fetch    soğuk depoya 4 / 16 / 64 coin fanout
+#   bench_compute  SMA matrisi, önbellekli SMA, yarım genişlik figür, tarama
+# CoinGecko yerel stub'dan, yfinance yahoo_replay'den gelir; gecikme ve 429
+# oranı ayarlanabilir. Kayıtlı yanıtlar (benchmarks/fixtures/) depoda yok:
+# kaydedilmedikçe ölçümler coin / sembol adından türetilen sentetik seriler
+# üzerindendir (özet satırı kayıttan dönen yanıt sayısını gösterir). Gerçek
+# yanıtlarla ölçmek için önce kaydedin:
+#   python benchmarks/coingecko_stub.py --record   (uygulamayı bu adresle gezin)
+#   python benchmarks/yahoo_replay.py --record AKBNK.IS THYAO.IS --days 800
+# Bu betik sadece pytest'i varsayılan gecikme ile çağırır; her çalışma
+# .benchmarks/ altına kaydedilir ve --compare ile önceki bir çalışmayla
+# (commit) karşılaştırılır.
+#
+#   python benchmarks/suite.py
+#   python benchmarks/suite.py --latency 0.1 --error-rate 0.05 --compare 0001
+#   python benchmarks/suite.py --only page_cold
+# Doğrudan pytest ile de aynısı:
+#   pytest tests/bench_pages.py --benchmark-autosave --stub-latency 0.05
+#   pytest tests/bench_*.py --benchmark-compare --benchmark-compare-fail=median:10%
+def parse_args():
+    parser = argparse.ArgumentParser(description="Uçtan uca render / fetch / SMA / figür benchmark'ları (pytest-benchmark)",
+                                     epilog="Tanınmayan argümanlar pytest'e geçirilir.")
+    parser.add_argument("--latency", type=float, default=0.05, help="istek başına gecikme (sn)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 enjekte edilen istek oranı")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="enjekte edilen 429'daki Retry-After (sn)")
+    parser.add_argument("--repeat", type=int, default=3, help="sayfa / fanout ölçümlerinde tur sayısı")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", default="", help="pytest -k ifadesi (ör. page_cold, fanout)")
+    parser.add_argument("--json", help="sonuçları bu dosyaya da yaz")
+    parser.add_argument("--compare", nargs="?", const="", default=None,
+                        help="kayıtlı çalışmayla karşılaştır (numara; boş → sonuncusu)")
+    args, rest = parser.parse_known_args()
+    if importlib.util.find_spec("pytest_benchmark") is None:
+        parser.error("benchmark'lar için pytest-benchmark gerekli: pip install pytest-benchmark")
+    return args, rest
+
+
+def main():
+    args, rest = parse_args()
+    argv = sorted(glob.glob(os.path.join(ROOT, "tests", "bench_*.py"))) + [
+        "--benchmark-only", "--benchmark-autosave",
+        "--stub-latency", str(args.latency), "--stub-error-rate", str(args.error_rate),
+        "--stub-retry-after", str(args.retry_after), "--stub-seed", str(args.seed),
+        "--page-rounds", str(args.repeat),
+    ]
+    if args.only:
+        argv += ["-k", args.only]
+    if args.json:
+        argv.append(f"--benchmark-json={args.json}")
+    if args.compare is not None:
+        argv.append(f"--benchmark-compare={args.compare}" if args.compare else "--benchmark-compare")
+    return pytest.main(argv + rest + ["--rootdir", ROOT, "-c", os.path.join(ROOT, "pytest.ini")])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
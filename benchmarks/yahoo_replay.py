@@ -0,0 +1,141 @@
+import argparse
+import os
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+# -------------------------------------------------
+# yfinance tekrar oynatıcı (ağ yok)
+# -------------------------------------------------
+# yf.download / yf.Ticker.history yerine kayıtlı günlük barları
+# (fixtures/yahoo/<SEMBOL>.csv) döner; kayıt yoksa sembolden türetilen
+# deterministik seri üretir. Gecikme ve hata (429 benzeri) enjekte edilebilir.
+# fixtures/ depoya eklenmez: kaydedilmediyse barlar sentetiktir (`replayed` sayacı).
+#
+#   import yahoo_replay; yahoo_replay.install(latency=0.2, error_rate=0.1)
+#   python benchmarks/yahoo_replay.py --record AKBNK.IS THYAO.IS --days 800
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "yahoo")
+
+_real = {"download": yf.download, "Ticker": yf.Ticker}
+
+
+class ReplayRateLimit(Exception):
+    # yfinance'in YFRateLimitError'ı gibi: çağıran tarafta yakalanır
+    pass
+
+
+def fixture_path(symbol):
+    return os.path.join(FIXTURES, symbol.replace("/", "_") + ".csv")
+
+
+def synthetic_history(symbol, start, end):
+    # İş günleri, yfinance günlük barları gibi İstanbul saatine bağlı
+    idx = pd.date_range(pd.Timestamp(start), pd.Timestamp(end) - pd.Timedelta(days=1), freq="B",
+                        tz="Europe/Istanbul")
+    seed = zlib.crc32(symbol.encode())
+    day = (idx.tz_localize(None).asi8 // 86_400_000_000_000).astype("float64")
+    close = 10 + (seed % 90) + 3 * np.sin(day / 30 + seed)
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99, "Close": close,
+                         "Volume": 1_000_000.0}, index=idx)
+
+
+def history(symbol, start, end):
+    path = fixture_path(symbol)
+    if not os.path.exists(path):
+        return synthetic_history(symbol, start, end)
+    df = pd.read_csv(path, index_col=0)
+    df.index = pd.to_datetime(df.index, utc=True).tz_convert("Europe/Istanbul")
+    lo = pd.Timestamp(start).tz_localize("Europe/Istanbul")
+    hi = pd.Timestamp(end).tz_localize("Europe/Istanbul")
+    return df[(df.index >= lo) & (df.index < hi)]
+
+
+class Replay:
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.replayed = 0  # kayıttan (fixtures/) dönen sembol sayısı
+        self._lock = threading.Lock()
+
+    def _hit(self):
+        with self._lock:
+            self.calls += 1
+            failed = self.rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        time.sleep(self.latency)
+        if failed:
+            raise ReplayRateLimit("Too Many Requests. Rate limited. Try after a while.")
+
+    def _history(self, symbol, start, end):
+        if os.path.exists(fixture_path(symbol)):
+            with self._lock:
+                self.replayed += 1
+        return history(symbol, start, end)
+
+    def download(self, symbols, start=None, end=None, group_by="column", **kwargs):
+        # Tek istek: tüm semboller birlikte
+        self._hit()
+        symbols = [symbols] if isinstance(symbols, str) else list(symbols)
+        frames = {s: self._history(s, start, end).tz_localize(None) for s in symbols}
+        if len(symbols) == 1 and group_by != "ticker":
+            return frames[symbols[0]]
+        return pd.concat(frames, axis=1)
+
+    def ticker(self, symbol):
+        replay = self
+
+        class Ticker:
+            def __init__(self, *args, **kwargs):
+                self.ticker = symbol
+
+            def history(self, start=None, end=None, interval="1d", **kwargs):
+                replay._hit()
+                return replay._history(symbol, start, end)
+
+        return Ticker()
+
+
+def install(latency=0.0, error_rate=0.0, seed=0):
+    # yfinance modülündeki giriş noktalarını değiştirir → Replay (sayaçlar için)
+    replay = Replay(latency, error_rate, seed)
+    yf.download = replay.download
+    yf.Ticker = replay.ticker
+    return replay
+
+
+def uninstall():
+    yf.download = _real["download"]
+    yf.Ticker = _real["Ticker"]
+
+
+def record(symbols, days):
+    os.makedirs(FIXTURES, exist_ok=True)
+    end = pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+    start = end - pd.Timedelta(days=days)
+    for symbol in symbols:
+        df = _real["Ticker"](symbol).history(start=start.date(), end=end.date(), interval="1d")
+        if not df.empty:
+            df.to_csv(fixture_path(symbol))
+            print(f"{symbol}: {len(df)} bar → {fixture_path(symbol)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="yfinance günlük barlarını fixtures altına kaydet")
+    parser.add_argument("--record", nargs="+", metavar="SEMBOL", required=True)
+    parser.add_argument("--days", type=int, default=800)
+    args = parser.parse_args()
+    record(args.record, args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+# -------------------------------------------------
+# Seyreltme (LTTB) — trace başına nokta sayısı grafik genişliğiyle sınırlı
+# -------------------------------------------------
+# 2×2 düzende grafik ≈ 800 px, tek grafik ≈ 1600 px; piksel sütunu başına
+# birden fazla nokta tarayıcıda görünmez, sadece JSON'u büyütür.
+HALF_WIDTH_POINTS = 800
+FULL_WIDTH_POINTS = 1600
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: seçilen noktaların indeksleri (ilk ve son dahil)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype("int64") + 1
+    edges[-1] = n - 1
+    idx = np.empty(n_out, dtype="int64")
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(df, max_points, column="Close"):
+    # Tüm sütunlar aynı indekslerle seyreltilir (hover "x unified" hizalı kalır)
+    if len(df) <= max_points:
+        return df
+    y = df[column].to_numpy(dtype="float64")
+    idx = lttb_indices(df.index.asi8, y, max_points)
+    # Görsel uç değerler her zaman kalsın
+    idx = np.union1d(idx, [np.nanargmin(y), np.nanargmax(y)])
+    return df.iloc[idx]
+
+
+# -------------------------------------------------
+# Grafik şablonu (layout + trace stilleri bir kez kurulur)
+# -------------------------------------------------
+# Layout sayfa türü başına bir kez doğrulanıp (plotly_dark çözümlemesi dahil)
+# dict olarak saklanır; her grafikte sadece x/y dizileri ve başlık değişir.
+PRICE_STYLE = dict(mode="lines", line=dict(color="#00CED1", width=2),
+                   fill="tozeroy", fillcolor="rgba(0, 206, 209, 0.05)")
+CANDLE_STYLE = dict(increasing=dict(line=dict(color="#26A69A"), fillcolor="#26A69A"),
+                    decreasing=dict(line=dict(color="#EF5350"), fillcolor="#EF5350"))
+SMA_STYLES = [("SMA20", "#ADD8E6"), ("SMA50", "#FFFF99"), ("SMA100", "#FFA500"), ("SMA200", "#FF0000")]
+GL_POINTS = 5000  # seyreltme kapalıyken bunun üstü WebGL ile çizilir
+
+_AXIS_GRID = "rgba(128,128,128,0.2)"
+LAYOUTS = {
+    # 2×2 düzen (CRYPTO / BIST)
+    "half": dict(
+        title_font=dict(size=16, family="Arial", color="#FFFFFF"),
+        xaxis=dict(tickangle=45, tickfont=dict(size=10, color="#CCCCCC"), gridcolor=_AXIS_GRID),
+        yaxis=dict(tickfont=dict(size=10, color="#CCCCCC"), gridcolor=_AXIS_GRID),
+        hovermode="x unified", showlegend=True,
+        legend=dict(font=dict(size=9), bgcolor="rgba(0,0,0,0.5)"),
+        template="plotly_dark",
+        margin=dict(l=20, r=20, t=50, b=20),
+        height=380,
+    ),
+    # Tam ekran (SINGLE)
+    "full": dict(
+        title_font=dict(size=24, family="Arial", color="#FFFFFF"),
+        xaxis_title="Tarih", xaxis_title_font=dict(size=16, color="#CCCCCC"),
+        yaxis_title_font=dict(size=16, color="#CCCCCC"),
+        xaxis=dict(tickangle=45, tickfont=dict(size=12, color="#CCCCCC"), gridcolor=_AXIS_GRID),
+        yaxis=dict(tickfont=dict(size=12, color="#CCCCCC"), gridcolor=_AXIS_GRID),
+        hovermode="x unified", showlegend=True,
+        legend=dict(font=dict(size=12), bgcolor="rgba(0,0,0,0.5)"),
+        template="plotly_dark",
+        height=700,
+        margin=dict(l=60, r=60, t=100, b=60),
+    ),
+    # Veri yok
+    "empty": dict(template="plotly_dark", height=380, margin=dict(l=30, r=30, t=70, b=30)),
+}
+
+_layout_cache = {}
+
+
+def layout_template(kind):
+    if kind not in _layout_cache:
+        _layout_cache[kind] = go.Layout(**LAYOUTS[kind]).to_plotly_json()
+    return _layout_cache[kind]
+
+
+def _figure(data, layout):
+    # Şablon zaten doğrulandı → plotly doğrulaması atlanır
+    return go.Figure(dict(data=data, layout=layout), _validate=False)
+
+
+def empty_figure(text="Veri alınamadı"):
+    layout = dict(layout_template("empty"))
+    layout["annotations"] = [dict(text=text, xref="paper", yref="paper", x=0.5, y=0.5,
+                                  showarrow=False, font=dict(size=14, color="red"))]
+    return _figure([], layout)
+
+
+def price_figure(kind, df, title, price_name="Fiyat", yaxis_title=None, candles=False):
+    # candles: Open/High/Low/Close sütunlarından mum grafiği (SMA'lar çizgi olarak üstte)
+    x = df.index
+    trace_type = "scattergl" if len(df) > GL_POINTS else "scatter"
+    candles = candles and {"Open", "High", "Low"}.issubset(df.columns)
+    if candles:
+        data = [dict(CANDLE_STYLE, type="candlestick", x=x, open=df["Open"].to_numpy(), high=df["High"].to_numpy(),
+                     low=df["Low"].to_numpy(), close=df["Close"].to_numpy(), name=price_name)]
+    else:
+        data = [dict(PRICE_STYLE, type=trace_type, x=x, y=df["Close"].to_numpy(), name=price_name)]
+    for col, color in SMA_STYLES:
+        if col in df.columns:
+            y = df[col].to_numpy()
+            if np.isfinite(y).any():
+                data.append(dict(type=trace_type, x=x, y=y, mode="lines", name=col,
+                                 line=dict(color=color, width=1.5)))
+
+    template = layout_template(kind)
+    layout = dict(template)
+    layout["title"] = dict(template.get("title", {}), text=title)
+    if yaxis_title is not None:
+        layout["yaxis"] = dict(template["yaxis"], title=dict(template["yaxis"].get("title", {}), text=yaxis_title))
+    if candles:
+        # Mum grafiğinin varsayılan alt kaydırıcısı 380 px'lik hücrede yer kaplar
+        layout["xaxis"] = dict(template["xaxis"], rangeslider=dict(visible=False))
+    return _figure(data, layout)
+
+
+# -------------------------------------------------
+# Karşılaştırma grafikleri (korelasyon ısı haritası + çoklu çizgi)
+# -------------------------------------------------
+LEGEND_MAX = 20  # bundan fazla çizgide lejant yerine sadece hover
+
+
+def heatmap_figure(matrix, labels, title):
+    # matrix: (S, S) korelasyon; -1 kırmızı, +1 mavi
+    data = [dict(type="heatmap", z=matrix, x=labels, y=labels, zmin=-1, zmax=1, zmid=0,
+                 colorscale="RdBu", colorbar=dict(title=dict(text="ρ")),
+                 hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>")]
+    template = layout_template("full")
+    layout = dict(template, title=dict(template.get("title", {}), text=title), hovermode="closest")
+    # Çok sembolde etiketler sıkışmasın, kare kalsın
+    size = max(500, min(1100, 14 * len(labels) + 200))
+    font = dict(template["xaxis"].get("tickfont", {}), size=9 if len(labels) > 40 else 11)
+    layout.update(height=size, xaxis=dict(template["xaxis"], title=None, tickfont=font),
+                  yaxis=dict(template["yaxis"], title=None, autorange="reversed", tickfont=font))
+    return _figure(data, layout)
+
+
+def lines_figure(df, title, yaxis_title=None, reference=None):
+    # df: sütun başına bir çizgi (ör. 100 tabanlı performans); reference: yatay kılavuz çizgisi
+    trace_type = "scattergl" if len(df) * len(df.columns) > GL_POINTS else "scatter"
+    data = [dict(type=trace_type, x=df.index, y=df[col].to_numpy(), mode="lines", name=str(col), line=dict(width=1.5))
+            for col in df.columns]
+    template = layout_template("full")
+    layout = dict(template, title=dict(template.get("title", {}), text=title), showlegend=len(df.columns) <= LEGEND_MAX)
+    layout["height"] = 500
+    if len(df.columns) > LEGEND_MAX:
+        layout["hovermode"] = "closest"
+    if yaxis_title is not None:
+        layout["yaxis"] = dict(template["yaxis"], title=dict(template["yaxis"].get("title", {}), text=yaxis_title))
+    if reference is not None:
+        layout["shapes"] = [dict(type="line", xref="paper", x0=0, x1=1, y0=reference, y1=reference,
+                                 line=dict(color="rgba(200,200,200,0.5)", width=1, dash="dot"))]
+    return _figure(data, layout)
@@ -0,0 +1,326 @@
+import glob
+import os
+import threading
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+import bars
+import indicators
+import market_data
+import metrics
+import universe
+from price_store import COLUMNS, DEFAULT_PATH
+
+
+# -------------------------------------------------
+# Veri kaynakları (tüm sayfalar aynı arayüzü kullanır)
+# -------------------------------------------------
+# Her kaynak: sembol listesi + toplu yükleme (Close serisi, ısınma satırları
+# dahil). Seriler kalıcı depodan ve ortak önbellekten okunur; anahtar
+# (kaynak, sembol, çözünürlük) sayfadan bağımsızdır → aynı sembol başka
+# sayfada önbellekten gelir.
+# Sembol listesi: sıralı etiketler + etiket → id / id → etiket sözlükleri;
+# liste değişmedikçe aynı nesne döner (seçimler sözlükten, tarama yok).
+SymbolList = namedtuple("SymbolList", ["labels", "ids", "names"])
+EMPTY_SYMBOLS = SymbolList([], {}, {})
+
+
+def _symbol_list(ids, labels):
+    return SymbolList(list(labels), dict(zip(labels, ids)), dict(zip(ids, labels)))
+
+
+# -------------------------------------------------
+# Bayatken de sun, arka planda tazele (stale-while-revalidate)
+# -------------------------------------------------
+# REFRESH_SECONDS'ı geçmiş ama MAX_STALENESS_SECONDS'tan genç seri beklemeden
+# döner (sayfada "bayat" rozeti) ve tek bir arka plan thread'inde tazelenir.
+# Daha eski ya da hiç olmayan seri eskisi gibi çekilir; upstream hata / 429
+# verirse depodaki son iyi veri döner ve FAILURE_COOLDOWN boyunca o sembol
+# için bir daha beklenmez (tekrar deneme arka planda). Arka plan tazelemeleri
+# sırayla çalışır (daemon thread'ler tek kilitte bekler) → upstream'e ek yük sınırlı.
+MAX_STALENESS = float(os.environ.get("MAX_STALENESS_SECONDS", 6 * 3600))
+FAILURE_COOLDOWN = 60
+_revalidating = set()  # (kaynak, sembol, gün, çözünürlük): sırada ya da sürüyor
+_revalidate_lock = threading.Lock()
+_revalidate_run = threading.Lock()
+
+
+class DataSource:
+    name = None
+    title = None        # kaynak seçimindeki ad
+    item_label = None   # sembol seçim kutusunun etiketi
+    currency = "USD"
+    live = False        # canlı mod destekleniyor mu
+    intervals = {}      # depodaki çözünürlükler → ms (bar grafiklerinin kaynağı)
+    revalidate = False  # bayat seri beklemeden sunulup arka planda tazelenir mi
+
+    def __init__(self):
+        self._failed = {}   # sembol → son başarısız ön plan çekiminin zamanı
+
+    def list_symbols(self):
+        # → (SymbolList, uyarı metni ya da None)
+        raise NotImplementedError
+
+    def fetch_many(self, ids, days, warmup_rows, interval, max_age):
+        # → {id: DataFrame["Close"] | None}; max_age'den eski seriler upstream'den tazelenir
+        raise NotImplementedError
+
+    def load_many(self, ids, days, warmup_rows=0, interval=None, max_staleness=None):
+        # interval verilmezse kaynağın varsayılanı; max_staleness=0 → her zaman taze (toplu rapor)
+        max_staleness = MAX_STALENESS if max_staleness is None else max_staleness
+        refresh = market_data.REFRESH_SECONDS
+        if not self.revalidate or max_staleness <= refresh:
+            return self.fetch_many(ids, days, warmup_rows, interval, refresh)
+
+        now = time.time()
+        # Upstream az önce hata verdiyse son iyi veri beklemeden döner
+        cooling = [sym for sym in ids if now - self._failed.get(sym, 0) < FAILURE_COOLDOWN]
+        waiting = [sym for sym in ids if sym not in cooling]
+        out = {}
+        if waiting:
+            out.update(self.fetch_many(waiting, days, warmup_rows, interval, max_staleness))
+        if cooling:
+            out.update(self.fetch_many(cooling, days, warmup_rows, interval, float("inf")))
+
+        stale = []
+        for sym in ids:
+            fetched_at = out[sym].attrs.get("fetched_at") if out.get(sym) is not None else None
+            age = now - fetched_at if fetched_at is not None else float("inf")
+            if sym in waiting and age >= max_staleness:
+                self._failed[sym] = now
+            if age >= refresh:
+                stale.append(sym)
+        if stale:
+            metrics.count("stale_served_total", len(stale), help="Bayat ya da eksik sunulan seriler", source=self.name)
+            self._revalidate(stale, days, warmup_rows, interval)
+        return out
+
+    def _revalidate(self, ids, days, warmup_rows, interval):
+        # Aynı seri için sırada bekleyen tazeleme varsa yenisi eklenmez
+        with _revalidate_lock:
+            ids = [sym for sym in ids if (self.name, sym, days, interval) not in _revalidating]
+            _revalidating.update((self.name, sym, days, interval) for sym in ids)
+        if ids:
+            threading.Thread(target=self._revalidate_now, args=(ids, days, warmup_rows, interval),
+                             name="revalidate", daemon=True).start()
+
+    def _revalidate_now(self, ids, days, warmup_rows, interval):
+        try:
+            with _revalidate_run:
+                self.fetch_many(ids, days, warmup_rows, interval, market_data.REFRESH_SECONDS)
+            metrics.count("revalidations_total", len(ids), help="Arka plan tazelemeleri", source=self.name)
+        except Exception as e:
+            metrics.error("revalidate", e, f"{self.name} {len(ids)} sembol")
+        finally:
+            with _revalidate_lock:
+                _revalidating.difference_update((self.name, sym, days, interval) for sym in ids)
+
+    def stale_since(self, df):
+        # Bayat seri → son başarılı çekimin zamanı (epoch sn); taze ya da bilinmiyorsa None
+        fetched_at = df.attrs.get("fetched_at") if self.revalidate and df is not None else None
+        if fetched_at is None or time.time() - fetched_at < market_data.REFRESH_SECONDS:
+            return None
+        return fetched_at
+
+    def timeframes(self):
+        # Seçilebilir bar aralıkları: en ince çözünürlükten kısa olmayanlar
+        finest = min(self.intervals.values())
+        return [label for label, tf in bars.TIMEFRAMES.items() if bars.TIMEFRAME_MS[tf] >= finest]
+
+    def base_interval(self, days, timeframe):
+        # Barların kurulacağı depo serisi
+        return next(iter(self.intervals))
+
+    def bar_warmup_rows(self, bars_needed, timeframe, interval):
+        # N bar ısınma → taban serinin satır sayısı (SMA200 ilk gösterilen bardan dolu olsun)
+        step = self.intervals[interval]
+        if not step:
+            return bars_needed
+        return -(-bars_needed * bars.TIMEFRAME_MS[timeframe] // step)
+
+    def window_start(self, df, days):
+        return pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)
+
+    def format_price(self, price):
+        return f"${price:,.6f}"
+
+
+MAX_SUBBARS = 24  # bar başına en çok taban satırı (1 gün / saatlik)
+
+
+class CoinGeckoSource(DataSource):
+    name = "coingecko"
+    title = "Kripto Para"
+    item_label = "Kripto Para"
+    live = True
+    intervals = market_data.INTERVAL_MS
+    revalidate = True
+
+    def list_symbols(self):
+        # Diskteki anlık görüntü hemen döner; bayatsa arka planda fark güncellemesi
+        universe.coins.refresh_async()
+        labels, ids, names = universe.coins.lists()
+        warning = "Rate limit! Liste eksik olabilir, 1‑2 dakika sonra yenileyin." if universe.coins.rate_limited else None
+        return SymbolList(labels, ids, names), warning
+
+    def fetch_many(self, ids, days, warmup_rows, interval, max_age):
+        # Aynı coin'i aynı anda isteyen oturumlar tek HTTP çağrısını paylaşır;
+        # httpx + event loop sadece kripto verisi ilk istendiğinde yüklenir
+        import async_fetch
+        return async_fetch.get_backend().load_crypto_histories(ids, days, warmup_rows, interval, max_age)
+
+    def base_interval(self, days, timeframe):
+        # Çizgi grafiğin serisi bara yetecek kadar inceyse ve bar başına MAX_SUBBARS'ı
+        # geçmiyorsa o (ek çekim yok), değilse bardan kısa en kaba çözünürlük
+        # (ör. 365 gün + 4 saat → saatlik; 30 gün + 1 hafta → günlük, 200 haftalık ısınma
+        # saatlik seride ~16 istek + 33 bin satır olurdu)
+        interval = market_data.coingecko_interval(days)
+        limit = bars.TIMEFRAME_MS[timeframe]
+        if self.intervals[interval] <= limit and limit // self.intervals[interval] <= MAX_SUBBARS:
+            return interval
+        return max((i for i, ms in self.intervals.items() if ms <= limit), key=self.intervals.get)
+
+
+class YahooSource(DataSource):
+    name = "yahoo"
+    title = "BIST 100 Hisse"
+    item_label = "Hisse"
+    currency = "TL"
+    intervals = {"1d": market_data.DAY_MS}
+    revalidate = True
+
+    _symbols = None
+
+    def list_symbols(self):
+        # Sabit liste: process başına bir kez
+        if self._symbols is None:
+            symbols = sorted(set(market_data.BIST100))
+            names = [s.replace(".IS", "") for s in symbols]
+            self._symbols = _symbol_list(symbols, [f"{n} ({n})" for n in names])
+        return self._symbols, None
+
+    def bar_warmup_rows(self, bars_needed, timeframe, interval):
+        # Günlük seride satır = işlem günü: haftalık bar ≈ 5 satır (takvim gününe
+        # çeviri load_stock_histories'te)
+        trading_days = bars.TIMEFRAME_MS[timeframe] / market_data.DAY_MS * 5 / 7
+        return bars_needed * max(1, round(trading_days))
+
+    def fetch_many(self, ids, days, warmup_rows, interval, max_age):
+        # Eksik olanlar tek yf.download isteğinde (sadece günlük bar)
+        return market_data.load_stock_histories(list(ids), days, warmup_rows, max_age)
+
+    def format_price(self, price):
+        return f"₺{price:,.2f}"
+
+
+class LocalFileSource(DataSource):
+    # LOCAL_DATA_DIR altındaki CSV/Parquet dosyaları: tarih indeksi + "Close" sütunu.
+    # Dosya depoya aktarılır (mtime değişince yeniden), sonrası diğer kaynaklarla aynı yol.
+    name = "local"
+    title = "Yerel Dosya"
+    item_label = "Dosya"
+    currency = ""
+    interval = "file"
+    intervals = {"file": 0}  # dosyanın çözünürlüğü bilinmez: tüm bar aralıkları
+    directory = os.environ.get("LOCAL_DATA_DIR", os.path.join(os.path.dirname(DEFAULT_PATH), "local"))
+
+    def _files(self):
+        files = glob.glob(os.path.join(self.directory, "*.csv")) + glob.glob(os.path.join(self.directory, "*.parquet"))
+        return {os.path.splitext(os.path.basename(f))[0]: f for f in sorted(files)}
+
+    _symbols = (None, EMPTY_SYMBOLS)
+
+    def list_symbols(self):
+        # Dizindeki dosya adları değişmedikçe aynı liste
+        ids = tuple(self._files())
+        if self._symbols[0] != ids:
+            self._symbols = (ids, _symbol_list(ids, ids))
+        return self._symbols[1], None
+
+    def _read_file(self, path):
+        df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, index_col=0)
+        df = df.rename(columns=str.title)
+        index = pd.to_datetime(df.index, utc=True)
+        # Close zorunlu; Open/High/Low/Volume varsa mum grafikleri için saklanır
+        cols = [c for c in COLUMNS if c in df.columns]
+        return pd.DataFrame({c: df[c].to_numpy(dtype="float64") for c in cols}, index=index).sort_index()
+
+    def _import(self, symbol, path):
+        mtime = os.path.getmtime(path)
+        cov = market_data.store.coverage(self.name, symbol, self.interval)
+        if cov is None or cov.fetched_at < mtime:
+            df = self._read_file(path)
+            if not df.empty:
+                first_ts = int(df.index[0].value // 1_000_000)
+                market_data.store.write(self.name, symbol, self.interval, df, first_ts, mtime)
+
+    def fetch_many(self, ids, days, warmup_rows, interval, max_age):
+        # Dosyanın tamamı okunur; pencere son bara göre (window_start); tazelik dosyanın mtime'ı
+        files = self._files()
+        out = {}
+        for sym in ids:
+            if sym not in files:
+                out[sym] = None
+                continue
+            self._import(sym, files[sym])
+            out[sym] = market_data.read_close(self.name, sym, self.interval, 0)
+        return out
+
+    def window_start(self, df, days):
+        return df.index[-1] - pd.Timedelta(days=days)
+
+    def format_price(self, price):
+        return f"{price:,.4f}"
+
+
+SOURCES = {s.name: s for s in (CoinGeckoSource(), YahooSource(), LocalFileSource())}
+
+
+# -------------------------------------------------
+# Gösterge motoru: toplu yükleme → SMA'lar → gösterilen pencere
+# -------------------------------------------------
+def load_frames(source, ids, days, windows=indicators.SMA_WINDOWS, timeframe=None):
+    # SMA'lar ısınma satırları dahil tüm seri üzerinde, sadece son `days` gün döner
+    if timeframe is not None:
+        return load_bar_frames(source, ids, days, timeframe, windows)
+    with metrics.stage(f"load.{source.name}"):
+        histories = source.load_many(list(ids), days, max(windows))
+    out = {}
+    with metrics.stage("sma"):
+        for sym in ids:
+            df = histories.get(sym)
+            if df is None or df.empty:
+                out[sym] = None
+            else:
+                out[sym] = indicators.cached_sma_frame(df, source.window_start(df, days), windows)
+                out[sym].attrs["fetched_at"] = df.attrs.get("fetched_at")
+    return out
+
+
+def load_bar_frames(source, ids, days, timeframe, windows=indicators.SMA_WINDOWS):
+    # Barlar depodaki seriden yerel olarak; aynı seri çizgi grafikle ortaksa upstream çağrısı yok.
+    # SMA'lar bar kapanışları üzerinde: max(windows) bar ısınma, taban çözünürlüğün satırına çevrilir
+    interval = source.base_interval(days, timeframe)
+    # +1: pencere başındaki yarım bar
+    warmup_rows = source.bar_warmup_rows(max(windows) + 1, timeframe, interval)
+    with metrics.stage(f"load.{source.name}"):
+        histories = source.load_many(list(ids), days, warmup_rows, interval)
+    out = {}
+    with metrics.stage("resample"):
+        for sym in ids:
+            df = histories.get(sym)
+            ohlc = None
+            if df is not None and not df.empty:
+                ohlc = market_data.read_ohlc(source.name, sym, interval, df.index[0].value // 1_000_000)
+            if ohlc is None or ohlc.empty:
+                out[sym] = None
+                continue
+            b = bars.resample_ohlc(ohlc, timeframe)
+            frame = indicators.sma_frame(b, source.window_start(b, days), windows)
+            for col in ("Open", "High", "Low"):
+                frame[col] = b[col].reindex(frame.index)
+            frame.attrs["fetched_at"] = df.attrs.get("fetched_at")
+            out[sym] = frame
+    return out
@@ -0,0 +1,62 @@
+import glob
+import os
+import threading
+
+import numpy as np
+
+from price_store import DEFAULT_PATH
+
+
+# -------------------------------------------------
+# Bellek eşlemeli (mmap) kapanış dosyaları — process'ler arası ortak
+# -------------------------------------------------
+# Seri başına tek .npy: (2, n) int64, satır 0 = ts (ms), satır 1 = Close
+# (float64 bitleri, .view ile kopyasız okunur). Dosya adı depodaki kapsamı
+# (first_ts, last_ts, fetched_at) taşır: kapsam değişince yeni sürüm yazılır,
+# eskisi silinir. Yazım geçici dosya + os.replace → okuyan hiçbir zaman yarım
+# dosya görmez; eski sürümü mmap'lemiş okuyucular kendi kopyasıyla devam eder.
+# Aynı makinedeki tüm Streamlit process'leri aynı page-cache sayfalarını okur.
+HISTORY_MMAP = os.environ.get("HISTORY_MMAP", "1") != "0"
+HISTORY_DIR = os.environ.get("HISTORY_DIR", os.path.join(os.path.dirname(DEFAULT_PATH), "history"))
+
+
+def _dir(source, symbol):
+    return os.path.join(HISTORY_DIR, source, symbol.replace("/", "_"))
+
+
+def path(source, symbol, interval, cov):
+    name = f"{interval}-{int(cov.first_ts)}-{int(cov.last_ts)}-{int(cov.fetched_at * 1000)}.npy"
+    return os.path.join(_dir(source, symbol), name)
+
+
+def load(source, symbol, interval, cov):
+    # → (ts, close) salt okunur mmap görünümleri ya da dosya yoksa None
+    try:
+        arr = np.load(path(source, symbol, interval, cov), mmap_mode="r")
+    except FileNotFoundError:
+        return None
+    return arr[0], arr[1].view("float64")
+
+
+def save(source, symbol, interval, cov, ts, close):
+    target = path(source, symbol, interval, cov)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    arr = np.empty((2, len(ts)), dtype="int64")
+    arr[0] = ts
+    arr[1] = np.asarray(close, dtype="float64").view("int64")
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+
+    # Eski sürümler: açık mmap'ler silinen dosyada da geçerli kalır
+    for old in glob.glob(os.path.join(_dir(source, symbol), f"{interval}-*.npy")):
+        if old != target:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    # Kendi kopyamız yerine ortak sayfaları eşle
+    return load(source, symbol, interval, cov) or (arr[0], arr[1].view("float64"))
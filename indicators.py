@@ -0,0 +1,418 @@
+import os
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from price_cache import ColumnCache
+
+
+# -------------------------------------------------
+# SMA motoru (kümülatif toplam, tek geçiş)
+# -------------------------------------------------
+SMA_WINDOWS = (20, 50, 100, 200)
+WARMUP_ROWS = max(SMA_WINDOWS)  # en uzun pencere kadar geçmiş satır
+
+
+def sma_matrix(values, windows=SMA_WINDOWS):
+    # values: 1‑B fiyat dizisi → (len(windows), n) SMA matrisi, ısınma kısmı NaN
+    x = np.ascontiguousarray(values, dtype="float64")
+    n = len(x)
+    out = np.full((len(windows), n), np.nan)
+    if n == 0:
+        return out
+    # İlk değere göre kaydırarak kümülatif toplamdaki yuvarlama hatasını küçült
+    base = x[0]
+    csum = np.empty(n + 1)
+    csum[0] = 0.0
+    np.cumsum(x - base, out=csum[1:])
+    for i, w in enumerate(windows):
+        if w <= n:
+            out[i, w - 1:] = (csum[w:] - csum[:-w]) / w + base
+    return out
+
+
+def sma_frame(df, start=None, windows=SMA_WINDOWS):
+    # df: ısınma satırlarıyla birlikte "Close" serisi; start öncesi satırlar atılır
+    close = df["Close"].to_numpy(dtype="float64")
+    smas = sma_matrix(close, windows)
+    out = pd.DataFrame({"Close": close}, index=df.index)
+    for w, col in zip(windows, smas):
+        out[f"SMA{w}"] = col
+    if start is not None and len(out):
+        # Pencere boşsa (ör. hafta sonu 1 gün) en az son bar kalsın
+        out = out[out.index >= min(start, out.index[-1])]
+    return out
+
+
+# -------------------------------------------------
+# Artımlı SMA durumu (yeni bar → O(1))
+# -------------------------------------------------
+class SmaState:
+    # Pencere başına halka tampon + koşan toplam
+    def __init__(self, windows=SMA_WINDOWS):
+        self.windows = tuple(windows)
+        self._w = np.array(self.windows, dtype="float64")
+        self._bufs = [np.zeros(w) for w in self.windows]
+        self._sums = np.zeros(len(self.windows))
+        self.count = 0
+
+    @classmethod
+    def from_values(cls, values, windows=SMA_WINDOWS):
+        state = cls(windows)
+        x = np.asarray(values, dtype="float64")
+        n = len(x)
+        state.count = n
+        for i, w in enumerate(state.windows):
+            k = min(n, w)
+            state._bufs[i][np.arange(n - k, n) % w] = x[n - k:]
+            state._sums[i] = x[n - k:].sum()
+        return state
+
+    def values(self):
+        return np.where(self.count >= self._w, self._sums / self._w, np.nan)
+
+    def push(self, price):
+        for i, w in enumerate(self.windows):
+            buf = self._bufs[i]
+            pos = self.count % w
+            self._sums[i] += price - buf[pos]
+            buf[pos] = price
+            if pos == w - 1:
+                # Tampon her dolduğunda toplamı yeniden kur (kayan nokta birikimi)
+                self._sums[i] = buf.sum()
+        self.count += 1
+        return self.values()
+
+    def replace_last(self, price):
+        # Henüz kapanmamış son barın fiyatı değişti
+        for i, w in enumerate(self.windows):
+            buf = self._bufs[i]
+            pos = (self.count - 1) % w
+            self._sums[i] += price - buf[pos]
+            buf[pos] = price
+        return self.values()
+
+
+class IndicatorSeries:
+    # Önbellekteki seri + SMA sütunları + SmaState birlikte tutulur
+    def __init__(self, df, windows=SMA_WINDOWS):
+        self.windows = tuple(windows)
+        ts = df.index.as_unit("ns").asi8
+        close = df["Close"].to_numpy(dtype="float64")
+        self._n = n = len(close)
+        cap = max(64, 2 * n)
+        self._ts = np.empty(cap, dtype="int64")
+        self._close = np.empty(cap)
+        self._smas = np.full((len(self.windows), cap), np.nan)
+        self._ts[:n] = ts
+        self._close[:n] = close
+        self._smas[:, :n] = sma_matrix(close, self.windows)
+        self.state = SmaState.from_values(close, self.windows)
+
+    @property
+    def nbytes(self):
+        state = sum(b.nbytes for b in self.state._bufs)
+        return self._ts.nbytes + self._close.nbytes + self._smas.nbytes + state
+
+    def _grow(self):
+        cap = 2 * len(self._ts)
+        self._ts = np.resize(self._ts, cap)
+        self._close = np.resize(self._close, cap)
+        smas = np.full((len(self.windows), cap), np.nan)
+        smas[:, :self._n] = self._smas[:, :self._n]
+        self._smas = smas
+
+    def append(self, ts, price):
+        if self._n == len(self._ts):
+            self._grow()
+        self._ts[self._n] = ts
+        self._close[self._n] = price
+        self._smas[:, self._n] = self.state.push(price)
+        self._n += 1
+
+    def update_last(self, price):
+        self._close[self._n - 1] = price
+        self._smas[:, self._n - 1] = self.state.replace_last(price)
+
+    @property
+    def last(self):
+        # (son bar ts ns, kapanış) → canlı grafik çizdiği noktayla karşılaştırır
+        return (int(self._ts[self._n - 1]), float(self._close[self._n - 1])) if self._n else None
+
+    def tick(self, ts, price, step):
+        # Canlı fiyat (ts: ms): son barın içindeyse güncelle, sonraki bardaysa ekle
+        if self._n == 0:
+            return False
+        bucket = ts // step * step * 1_000_000
+        last = self._ts[self._n - 1]
+        if bucket == last:
+            if price == self._close[self._n - 1]:
+                return False
+            self.update_last(price)
+        elif bucket > last:
+            self.append(bucket, price)
+        else:
+            return False
+        return True
+
+    def sync(self, df):
+        # Sadece son bardan sonraki satırları işle; seri uyuşmuyorsa False → yeniden kur
+        ts = df.index.as_unit("ns").asi8
+        n = self._n
+        if not len(ts) or n == 0 or ts[0] < self._ts[0]:
+            return False
+        last = self._ts[n - 1]
+        i = int(np.searchsorted(ts, last))
+        if i >= len(ts) or ts[i] != last:
+            return False
+        j = int(np.searchsorted(self._ts[:n], ts[0]))
+        if n - j != i + 1:
+            return False
+
+        close = df["Close"].to_numpy(dtype="float64")
+        if close[i] != self._close[n - 1]:
+            self.update_last(close[i])
+        for t, price in zip(ts[i + 1:], close[i + 1:]):
+            self.append(t, price)
+        return True
+
+    def frame(self, start=None):
+        n = self._n
+        j = 0
+        if start is not None and n:
+            j = min(int(np.searchsorted(self._ts[:n], pd.Timestamp(start).value)), n - 1)
+        index = pd.DatetimeIndex(self._ts[j:n].view("M8[ns]"), name="timestamp").tz_localize("UTC")
+        out = pd.DataFrame({"Close": self._close[j:n].copy()}, index=index)
+        for w, col in zip(self.windows, self._smas[:, j:n]):
+            out[f"SMA{w}"] = col.copy()
+        return out
+
+
+# Seri başına durum bellekte kalır; toplam boyut bütçeyle sınırlı (LRU)
+INDICATOR_CACHE_MB = float(os.environ.get("INDICATOR_CACHE_MB", 32))
+_series = ColumnCache(int(INDICATOR_CACHE_MB * 2**20))
+metrics.register_cache("indicator", _series)
+_series_lock = threading.Lock()
+
+
+def cached_sma_frame(df, start=None, windows=SMA_WINDOWS):
+    # Depodan gelen seri (attrs["series_key"]) için durum process içinde saklanır
+    key = df.attrs.get("series_key")
+    if key is None:
+        return sma_frame(df, start, windows)
+    key = (key, tuple(windows))
+    with _series_lock:
+        series = _series.get(key)
+        if series is None or not series.sync(df):
+            series = IndicatorSeries(df, windows)
+        _series.put(key, series, series.nbytes)
+        return series.frame(start)
+
+
+def live_tick(key, ts, price, step, windows=SMA_WINDOWS):
+    # Önbellekteki seriye tek fiyat işler; seri yoksa (henüz çizilmedi) False
+    with _series_lock:
+        key = (key, tuple(windows))
+        series = _series.get(key)
+        if series is None or not series.tick(ts, price, step):
+            return False
+        _series.put(key, series, series.nbytes)
+        return True
+
+
+def live_last(key, windows=SMA_WINDOWS):
+    with _series_lock:
+        series = _series.get((key, tuple(windows)))
+        return series.last if series is not None else None
+
+
+def live_frame(key, start=None, windows=SMA_WINDOWS):
+    with _series_lock:
+        series = _series.get((key, tuple(windows)))
+        return series.frame(start) if series is not None else None
+
+
+# -------------------------------------------------
+# Tarayıcı (tüm evren tek 2‑B matriste)
+# -------------------------------------------------
+CROSS_FAST, CROSS_SLOW = 50, 200  # golden / death cross çifti
+
+
+def close_matrix(histories):
+    # {sembol: df} → ortak zaman ekseninde (T, S) kapanış matrisi; boşluklar ileri doldurulur
+    frames = {sym: df["Close"] for sym, df in histories.items() if df is not None and not df.empty}
+    if not frames:
+        return pd.DatetimeIndex([], tz="UTC"), [], np.empty((0, 0))
+    wide = pd.concat(frames, axis=1, sort=True).ffill()
+    return wide.index, list(wide.columns), wide.to_numpy(dtype="float64")
+
+
+def sma_tail(close, windows=SMA_WINDOWS, rows=1):
+    # close: (T, S), baştaki NaN'ler (geç başlayan seri) pencereyi geçersiz kılar
+    # → (len(windows), rows, S): her SMA'nın sadece son `rows` satırı
+    t, s = close.shape
+    rows = min(rows, t)
+    valid = np.isfinite(close)
+    # Sütun başına ilk geçerli değere göre kaydır (yuvarlama hatası, bkz. sma_matrix)
+    base = close[valid.argmax(axis=0), np.arange(s)]
+    base = np.where(np.isfinite(base), base, 0.0)
+    x = np.where(valid, close - base, 0.0)
+    csum = np.zeros((t + 1, s))
+    np.cumsum(x, axis=0, out=csum[1:])
+    ccnt = np.zeros((t + 1, s), dtype="int64")
+    np.cumsum(valid, axis=0, out=ccnt[1:])
+
+    out = np.full((len(windows), rows, s), np.nan)
+    end = np.arange(t - rows + 1, t + 1)  # csum'daki satır sonları
+    for i, w in enumerate(windows):
+        ok = end >= w
+        e = end[ok]
+        total = csum[e] - csum[e - w]
+        full = (ccnt[e] - ccnt[e - w]) == w
+        out[i, ok] = np.where(full, total / w + base, np.nan)
+    return out
+
+
+def scan(close, lookback=5, windows=SMA_WINDOWS, fast=CROSS_FAST, slow=CROSS_SLOW):
+    # Son bar için SMA uzaklıkları (%), trend ve son `lookback` bardaki kesişimler
+    smas = sma_tail(close, windows, lookback + 1)
+    last = close[-1] if len(close) else np.empty(0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dist = (last / smas[:, -1] - 1) * 100  # (len(windows), S)
+
+    diff = smas[windows.index(fast)] - smas[windows.index(slow)]  # (lookback+1, S)
+    prev, cur = diff[:-1], diff[1:]
+    golden = (prev <= 0) & (cur > 0)
+    death = (prev >= 0) & (cur < 0)
+    crossed = golden | death
+    # En son kesişim: ters çevrilmiş eksende ilk True
+    cols = np.arange(close.shape[1])
+    any_cross = crossed.any(axis=0)
+    if not len(cur):
+        return dict(close=last, smas=smas[:, -1], dist=dist, trend=np.sign(diff[-1]),
+                    cross=np.zeros(len(cols), dtype="int64"), bars_ago=np.full(len(cols), -1))
+    bars_ago = np.where(any_cross, crossed[::-1].argmax(axis=0), -1)
+    row = len(cur) - 1 - np.maximum(bars_ago, 0)
+    kind = np.where(~any_cross, 0, np.where(golden[row, cols], 1, -1))
+    return dict(close=last, smas=smas[:, -1], dist=dist, trend=np.sign(diff[-1]), cross=kind, bars_ago=bars_ago)
+
+
+def scan_frame(histories, lookback=5, windows=SMA_WINDOWS):
+    index, symbols, close = close_matrix(histories)
+    if not symbols:
+        return pd.DataFrame()
+    res = scan(close, lookback, windows)
+    out = pd.DataFrame({"Close": res["close"]}, index=pd.Index(symbols, name="symbol"))
+    for w, d in zip(windows, res["dist"]):
+        out[f"SMA{w} %"] = d
+    out["Trend"] = np.select([res["trend"] > 0, res["trend"] < 0], ["↑", "↓"], "")
+    out["Kesişim"] = np.select([res["cross"] > 0, res["cross"] < 0], ["Golden", "Death"], "")
+    out["Kaç bar önce"] = np.where(res["bars_ago"] >= 0, res["bars_ago"], np.nan)
+    # İleri doldurulan semboller için gerçek son bar tarihi
+    out["Son bar"] = [histories[s].index[-1] for s in symbols]
+    return out
+
+
+# -------------------------------------------------
+# Karşılaştırma: normalize getiri, korelasyon matrisi, kayan beta
+# -------------------------------------------------
+# Sepet tarayıcıdaki gibi tek (T, S) matriste; eksik barlar (geç başlayan
+# seri) NaN olarak kalır ve her çift / pencere sadece ortak geçerli
+# satırlarla hesaplanır. Döngü sembol başına değil: matris çarpımı + cumsum.
+def log_returns(close):
+    # (T, S) kapanış → (T, S) log getiri; ilk satır ve eksik barlar NaN
+    out = np.full(close.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[1:] = np.log(close[1:] / close[:-1])
+    return out
+
+
+def normalized(close):
+    # Her sütun ilk geçerli değerine göre 100 tabanlı
+    valid = np.isfinite(close)
+    first = close[valid.argmax(axis=0), np.arange(close.shape[1])]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return close / first * 100
+
+
+def corr_matrix(returns, min_periods=10):
+    # Çift bazında ortak geçerli satırlar üzerinden Pearson korelasyonu, (S, S)
+    valid = np.isfinite(returns)
+    m = valid.astype("float64")
+    x = np.where(valid, returns, 0.0)
+    n = m.T @ m
+    sx = x.T @ m            # sx[i, j]: j'nin de geçerli olduğu satırlarda Σ x_i
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx * sx / n
+        out = cov / np.sqrt(var_x * var_x.T)
+    out[n < min_periods] = np.nan
+    return np.clip(out, -1.0, 1.0)
+
+
+def rolling_beta(returns, bench, window, min_periods=None):
+    # returns: (T, S), bench: (T,) → kayan beta ve korelasyon (T, S); pencere cumsum farkıyla
+    min_periods = min_periods or max(3, window // 2)
+    valid = np.isfinite(returns) & np.isfinite(bench)[:, None]
+    x = np.where(valid, returns, 0.0)
+    y = np.where(valid, bench[:, None], 0.0)
+
+    def win(a):
+        c = np.zeros((a.shape[0] + 1, a.shape[1]))
+        np.cumsum(a, axis=0, out=c[1:])
+        lo = np.maximum(np.arange(1, a.shape[0] + 1) - window, 0)
+        return c[1:] - c[lo]
+
+    n = win(valid.astype("float64"))
+    sx, sy = win(x), win(y)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = win(x * y) - sx * sy / n
+        var_x = win(x * x) - sx * sx / n
+        var_y = win(y * y) - sy * sy / n
+        beta = cov / var_y
+        corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+    short = n < min_periods
+    beta[short] = np.nan
+    corr[short] = np.nan
+    return beta, corr
+
+
+def compare_frame(histories, start, window=30, benchmark=None, corr_last=True):
+    # → dict: performance / beta / corr_bench (T, S) ve corr (S, S) DataFrame'leri + özet tablo
+    # start: gösterilen pencerenin başı (öncesi sadece kayan hesapların ısınması)
+    # benchmark: sepetteki bir sembol ya da None (eşit ağırlıklı sepet ortalaması)
+    index, symbols, close = close_matrix(histories)
+    if not symbols:
+        return None
+    returns = log_returns(close)
+    i = min(int((index < start).sum()), len(index) - 1)  # indeks sıralı; ms ↔ ns birim farkı sorun olmaz
+    with warnings.catch_warnings():
+        # Tamamı NaN satır / sütunlar (nanmean, nanstd) NaN döner, uyarı gerekmez
+        warnings.simplefilter("ignore", RuntimeWarning)
+        bench = returns[:, symbols.index(benchmark)] if benchmark in symbols else np.nanmean(returns, axis=1)
+        vol = np.nanstd(returns[i + 1:], axis=0) * 100
+    beta, corr_b = rolling_beta(returns, bench, window)
+
+    shown = index[i:]
+    corr = corr_matrix(returns[-window:] if corr_last else returns[i + 1:], min_periods=max(3, window // 2))
+    perf = normalized(close[i:])
+    cols = pd.Index(symbols, name="symbol")
+    summary = pd.DataFrame({
+        "Getiri %": perf[-1] - 100,
+        "Beta": beta[-1],
+        "Korelasyon": corr_b[-1],
+        # Bar getirilerinin std'si (aynı çözünürlükteki semboller arasında karşılaştırma için)
+        "Oynaklık %": vol,
+    }, index=cols)
+    return dict(
+        performance=pd.DataFrame(perf, index=shown, columns=cols),
+        beta=pd.DataFrame(beta[i:], index=shown, columns=cols),
+        corr_bench=pd.DataFrame(corr_b[i:], index=shown, columns=cols),
+        corr=pd.DataFrame(corr, index=cols, columns=cols),
+        summary=summary,
+    )
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pandas as pd
+
+import indicators
+import market_data
+import metrics
+
+
+# -------------------------------------------------
+# Canlı fiyat akışı (CoinGecko /simple/price, process başına ortak)
+# -------------------------------------------------
+# Her fragment çalışması sayfadaki tüm coin'leri ister; süresi dolan fiyatlar
+# tek istekte çekilir, aynı tick'teki diğer fragment'ler ve oturumlar
+# önbellekten okur. Yeni fiyat önbellekteki IndicatorSeries'e işlenir
+# (son bar güncellenir ya da yeni bar eklenir), SMA'lar O(1) ilerler. Grafik,
+# serinin son noktası oturumda çizilenden farklıysa yeniden kurulur.
+LIVE_INTERVALS = {"10 sn": 10, "30 sn": 30, "60 sn": 60}
+
+
+class LivePrices:
+    def __init__(self, fetch=market_data.fetch_simple_prices):
+        self.fetch = fetch
+        self.requests = 0
+        self._prices = {}  # id → (alındığı an, ts_ms, fiyat)
+        self._lock = threading.Lock()
+
+    def latest(self, coin_ids, max_age):
+        with self._lock:
+            now = time.monotonic()
+            stale = [c for c in coin_ids if c not in self._prices or now - self._prices[c][0] >= max_age]
+            metrics.count("cache_hits_total", len(coin_ids) - len(stale), cache="live_price")
+            if stale:
+                self.requests += 1
+                metrics.count("cache_misses_total", len(stale), cache="live_price")
+                with metrics.stage("live.fetch"):
+                    fetched = self.fetch(stale)
+                for cid, (ts, price) in fetched.items():
+                    self._prices[cid] = (now, ts, price)
+            return {c: self._prices[c][1:] for c in coin_ids if c in self._prices}
+
+
+prices = LivePrices()
+
+
+def apply_ticks(coin_ids, days, every):
+    # → {id: son bar (ts, kapanış)}; seri anahtarı yükleyiciyle aynı (kaynak, id, çözünürlük).
+    # Tick'i hangi fragment işlemiş olursa olsun her grafik kendi çizdiği noktayla karşılaştırır
+    interval = market_data.coingecko_interval(days)
+    step = market_data.INTERVAL_MS[interval]
+    try:
+        # Bir sonraki tick'te yeniden çekilsin diye yaş sınırı aralıktan biraz kısa
+        latest = prices.latest(list(coin_ids), every * 0.9)
+    except Exception as e:
+        # Çekim hatası fragment'i düşürmesin: son figür ekranda kalır, sonraki tick yeniden dener
+        metrics.error("live.fetch", e)
+        latest = {}
+    for cid, (ts, price) in latest.items():
+        indicators.live_tick(("coingecko", cid, interval), ts, price, step)
+    points = {}
+    for cid in coin_ids:
+        point = indicators.live_last(("coingecko", cid, interval))
+        if point is not None:
+            points[cid] = point
+    return points
+
+
+def frame(coin_id, days):
+    # Canlı seri, pencere başı her tick'te yeniden hesaplanır
+    key = ("coingecko", coin_id, market_data.coingecko_interval(days))
+    start = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=days)
+    return indicators.live_frame(key, start)
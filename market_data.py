@@ -0,0 +1,467 @@
+import json
+import logging
+import math
+import os
+import re
+import time
+import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import requests
+
+import history_files
+import metrics
+from price_cache import ColumnCache
+from price_store import PriceStore, to_epoch_ms
+from rate_limit import RateLimitedSession, TokenBucket
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Ortak ayarlar
+# -------------------------------------------------
+COINGECKO_URL = os.environ.get("COINGECKO_URL", "https://api.coingecko.com/api/v3")  # yerel stub için
+REFRESH_SECONDS = 300  # eski st.cache_data(ttl=300) ile aynı tazelik
+DAY_MS = 86_400_000
+INTERVAL_MS = {"5m": 300_000, "1h": 3_600_000, "1d": DAY_MS}
+# /range bu süreyi aşarsa CoinGecko bir kaba çözünürlüğe geçer
+RANGE_SPAN_MS = {"5m": DAY_MS, "1h": 90 * DAY_MS, "1d": None}
+# 5 dk veri sadece "şimdi"ye kadarki son 1 gün için verilir; daha eski aralık saatlik
+# gelir. 5m seri bu yüzden en fazla 1 gün geriden çekilir: soğuk depoda 1 günlük
+# pencerenin başında SMA ısınması eksik kalır, depo zamanla 5 dk geçmiş biriktirir.
+FINE_HISTORY_MS = {"5m": DAY_MS}
+
+# CoinGecko bütçesi: tüm sayfalar ve worker thread'ler aynı kovayı kullanır
+COINGECKO_RATE_PER_MIN = float(os.environ.get("COINGECKO_RATE_PER_MIN", 30))
+COINGECKO_BURST = int(os.environ.get("COINGECKO_BURST", 5))
+# Bellekteki kapanış serileri (ts int64 + Close float32) için toplam bütçe;
+# HISTORY_MMAP açıkken seriler ortak mmap dosyalarından okunur, bütçeye sayılmaz
+PRICE_CACHE_MB = float(os.environ.get("PRICE_CACHE_MB", 64))
+
+_http = requests.Session()
+_http.headers.update({
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0 (Streamlit Kripto App)"
+})
+session = RateLimitedSession(_http, TokenBucket(COINGECKO_RATE_PER_MIN / 60, COINGECKO_BURST))
+
+store = PriceStore()
+price_cache = ColumnCache(int(PRICE_CACHE_MB * 2**20))
+metrics.register_cache("price", price_cache)
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def coingecko_interval(days):
+    # CoinGecko çözünürlüğü: 1 gün → 5 dk, 2‑90 gün → saatlik, üstü → günlük
+    if days <= 1:
+        return "5m"
+    if days <= 90:
+        return "1h"
+    return "1d"
+
+
+def stock_warmup_days(rows):
+    # İşlem günü → takvim günü (hafta sonu + tatil payı)
+    return math.ceil(rows * 7 / 5) + 15 if rows else 0
+
+
+def _bucket_last(df, step):
+    # Aynı bara düşen noktalardan sonuncusunu tut (ts sıralı)
+    ts = df.index.as_unit("ms").asi8
+    buckets = ts // step * step
+    keep = np.r_[buckets[1:] != buckets[:-1], True]
+    return _frame(buckets[keep], df["Close"].to_numpy()[keep])
+
+
+def _plan(cov, start_ts, now, step, max_age=REFRESH_SECONDS):
+    # Depoda eksik kalan aralıklar: [(from_ts, to_ts), ...], yeni first_ts, fetched_at
+    # Baş boşluk (istenen pencere depodakinden geniş) + kuyruk (son bardan bu yana)
+    if cov is None:
+        return [(start_ts, now)], start_ts, None
+    gaps = []
+    fetched_at = cov.fetched_at
+    if start_ts < cov.first_ts - step:
+        gaps.append((start_ts, cov.first_ts))
+    if time.time() - cov.fetched_at >= max_age:
+        gaps.append((cov.last_ts, now))
+        fetched_at = None
+    return gaps, min(start_ts, cov.first_ts), fetched_at
+
+
+def _chunks(gaps, span):
+    # Sondan kesilir: son parça to_ts'de (kuyrukta "şimdi") biter, kısa kalan baş parçasıdır
+    for from_ts, to_ts in gaps:
+        cuts = []
+        while span and to_ts - from_ts > span:
+            cuts.append((to_ts - span, to_ts))
+            to_ts -= span
+        cuts.append((from_ts, to_ts))
+        yield from reversed(cuts)
+
+
+def _frame(ts, close):
+    # int64 ms dizisi → tz'li (UTC) DatetimeIndex, dönüşüm tek vektörel adımda
+    ts = np.asarray(ts, dtype="int64")
+    index = pd.DatetimeIndex(ts.view("M8[ms]"), name="timestamp").tz_localize("UTC")
+    # copy=False: mmap'ten gelen Close kopyalanmaz (salt okunur, CoW)
+    return pd.DataFrame({"Close": np.asarray(close, dtype="float64")}, index=index, copy=False)
+
+
+def _load_close(source, symbol, interval, cov, start_ts):
+    # → (kapsanan ilk ts, ts, close, bütçeye sayılan bayt)
+    if history_files.HISTORY_MMAP:
+        # Tüm seri mmap dosyasından; sayfalar process'ler arası ortak. Yine de eşlenen dosya
+        # boyutu bütçeye sayılır: her kayıt bir mmap + açık dosya tanımlayıcısı tutar, LRU
+        # atmazsa kayıt (ve fd) sayısı sınırsız büyür
+        arrays = history_files.load(source, symbol, interval, cov)
+        if arrays is None:
+            df = store.read(source, symbol, interval)
+            if df.empty:
+                return None
+            arrays = history_files.save(source, symbol, interval, cov, to_epoch_ms(df.index), df["Close"].to_numpy())
+        return (0, *arrays, sum(a.nbytes for a in arrays))
+    df = store.read(source, symbol, interval, start_ts)
+    if df.empty:
+        return None
+    ts = to_epoch_ms(df.index)
+    close = df["Close"].to_numpy(dtype="float32")
+    return start_ts, ts, close, ts.nbytes + close.nbytes
+
+
+def read_close(source, symbol, interval, start_ts):
+    # Depodan sadece Close; seri bellekte sıkıştırılmış tutulur, kapsam değişince bayatlar
+    key = (source, symbol, interval)
+    cov = store.coverage(source, symbol, interval)
+    if cov is None:
+        return None
+    cached = price_cache.get(key, cov, accept=lambda v: v[0] <= start_ts)
+    if cached is None:
+        loaded = _load_close(source, symbol, interval, cov, start_ts)
+        if loaded is None:
+            return None
+        cached, nbytes = loaded[:3], loaded[3]
+        price_cache.put(key, cached, nbytes, cov)
+    _, ts, close = cached
+    i = int(np.searchsorted(ts, start_ts))
+    if i == len(ts):
+        return None
+    df = _frame(ts[i:], close[i:])
+    # Göstergelerin artımlı durumu bu anahtarla eşleşir; fetched_at → bayatlık rozeti
+    df.attrs["series_key"] = key
+    df.attrs["fetched_at"] = cov.fetched_at
+    return df
+
+
+def read_ohlc(source, symbol, interval, start_ts):
+    # Bar grafikleri için depodaki tüm sütunlar (kripto serilerinde sadece Close var)
+    key = (source, symbol, interval, "ohlc")
+    cov = store.coverage(source, symbol, interval)
+    if cov is None:
+        return None
+    df = price_cache.get(key, cov)
+    if df is None:
+        df = store.read(source, symbol, interval)
+        if df.empty:
+            return None
+        price_cache.put(key, df, int(df.memory_usage(index=True).sum()), cov)
+    i = int(df.index.searchsorted(pd.Timestamp(start_ts, unit="ms", tz="UTC")))
+    return df.iloc[i:] if i < len(df) else None
+
+
+_BRACKETS = str.maketrans("", "", "[] \n\r\t")
+_OUTER = re.compile(r"\[\s*\]|\]\s*\]")
+_VALUE = re.compile(r"\s*:\s*\[")
+
+
+def _field_array(text, field):
+    # Ham JSON metninden tek alan: "[[t,v],[t,v]]" → düz float dizisi (liste kurulmaz)
+    # Sade sayı dışı bir şey (null, beklenmeyen biçim) → None: çağıran json yoluna düşer
+    key = text.find(f'"{field}"')
+    if key < 0:
+        return np.empty(0)
+    # Değer liste olmalı ("prices": null gibi) — yoksa sonraki alanın dizisi okunurdu
+    value = _VALUE.match(text, key + len(field) + 2)
+    if value is None:
+        return None
+    i = value.end() - 1
+    end = _OUTER.search(text, i)
+    if end is None:
+        return None
+    body = text[i:end.start()].translate(_BRACKETS)
+    if not body:
+        return np.empty(0)
+    if "null" in body:
+        return None
+    with warnings.catch_warnings():
+        # fromstring tanımadığı yerde sadece uyarıp kısa dizi döner → hata say
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            flat = np.fromstring(body, sep=",")
+        except (ValueError, DeprecationWarning):
+            return None
+    return flat if len(flat) == body.count(",") + 1 else None
+
+
+def parse_market_chart(payload, field="prices"):
+    # CoinGecko [[ts_ms, değer], ...] → DataFrame (satır başına Python çağrısı yok)
+    # payload: ham gövde (bytes/str) ya da önceden çözülmüş dict
+    flat = None
+    if not isinstance(payload, dict):
+        text = payload.decode() if isinstance(payload, bytes) else payload
+        flat = _field_array(text, field)
+        if flat is None:
+            payload = json.loads(text)
+    if flat is None:
+        # null → NaN (eski pd.DataFrame(data["prices"]) davranışı)
+        rows = [row for row in payload.get(field) or [] if row is not None]
+        flat = np.asarray([[np.nan if v is None else v for v in row[:2]] for row in rows], dtype="float64")
+    arr = flat.reshape(-1, 2)
+    arr = arr[~np.isnan(arr).any(axis=1)]
+    return _frame(arr[:, 0].astype("int64"), arr[:, 1])
+
+
+# -------------------------------------------------
+# Evren listeleri
+# -------------------------------------------------
+# GÜNCEL BIST 100 LİSTESİ (2025)
+BIST100 = [
+    "AKBNK.IS", "ASELS.IS", "BIMAS.IS", "EKGYO.IS", "EREGL.IS", "FROTO.IS",
+    "GARAN.IS", "ISCTR.IS", "KCHOL.IS", "PETKM.IS", "SAHOL.IS", "SISE.IS",
+    "TCELL.IS", "THYAO.IS", "TUPRS.IS", "VAKBN.IS", "YKBNK.IS", "ARCLK.IS",
+    "HALKB.IS", "KOZAL.IS", "PGSUS.IS", "SASA.IS", "TAVHL.IS", "TOASO.IS",
+    "TTKOM.IS", "VESBE.IS", "YATAS.IS", "ALARK.IS", "BRSAN.IS", "DOHOL.IS",
+    "ENJSA.IS", "GUBRF.IS", "HEKTS.IS", "KARSN.IS", "KRDMD.IS", "OTKAR.IS",
+    "OYAKC.IS", "QUAGR.IS", "SKBNK.IS", "TTRAK.IS", "ULKER.IS", "VESTL.IS",
+    "ZOREN.IS", "AEFES.IS", "AKSA.IS", "AKSGY.IS", "ALGYO.IS", "AYGAZ.IS",
+    "BAGFS.IS", "BLCYT.IS", "BRISA.IS", "CEMTS.IS", "CIMSA.IS", "DEVA.IS",
+    "DOAS.IS", "ECILC.IS", "EGEEN.IS", "ENKAI.IS", "ERBOS.IS", "FENER.IS",
+    "GENIL.IS", "GESAN.IS", "GOLTS.IS", "GOZDE.IS", "GSDHO.IS", "INDES.IS",
+    "ISGYO.IS", "ISMEN.IS", "KONTR.IS", "KORDS.IS", "KUTPO.IS", "MAVI.IS",
+    "MGROS.IS", "NTHOL.IS", "ODAS.IS", "PRKME.IS", "RALYH.IS", "SOKM.IS",
+    "TKFEN.IS", "TRKCM.IS", "TURSG.IS", "ZOREN.IS", "AFYON.IS", "ANHYT.IS",
+    "BAGFS.IS", "BLCYT.IS", "BRISA.IS", "CEMTS.IS", "CIMSA.IS", "DEVA.IS"
+]
+
+COIN_EXCLUDE = ["bridged", "wrapped", "vault", "token", "usd", "usdc", "usdt", "tether", "stake", "stable"]
+
+
+MarketList = namedtuple("MarketList", ["records", "rate_limited", "complete", "requests"])
+
+
+def fetch_coin_markets(pages=4, per_page=250):
+    # /coins/markets sayfaları → MarketList; 429'da gelen sayfalarla devam.
+    # Satırlar ham (filtre + sıralama universe.CoinUniverse'te, sadece yeni id'lere)
+    records = []
+    rate_limited = False
+    complete = True
+    requests_made = 0
+    for page in range(1, pages + 1):
+        params = {
+            "vs_currency": "usd",
+            "order": "market_cap_desc",
+            "per_page": per_page,
+            "page": page,
+            "sparkline": False,
+        }
+        requests_made += 1
+        try:
+            r = session.get(f"{COINGECKO_URL}/coins/markets", params=params, timeout=15, endpoint="coins/markets")
+            if r.status_code == 429:
+                rate_limited = True
+                complete = False
+                break
+            if r.status_code != 200:
+                complete = False
+                continue
+            data = r.json()
+            if not data:
+                break
+            records.extend({k: row.get(k) for k in ("id", "symbol", "name", "current_price", "market_cap_rank")}
+                           for row in data)
+            if len(data) < per_page:
+                break
+        except Exception as e:
+            complete = False
+            metrics.error("coingecko.markets", e, f"sayfa {page}")
+            continue
+    return MarketList(records, rate_limited, complete, requests_made)
+
+
+# -------------------------------------------------
+# KRİPTO (CoinGecko market_chart/range → depo)
+# -------------------------------------------------
+# Her coin+çözünürlük için tek seri tutulur; kısa pencereler en geniş
+# seriden dilimlenir, sadece eksik aralıklar /range ile çekilir.
+def fetch_market_chart_range(coin_id, from_ts, to_ts):
+    url = f"{COINGECKO_URL}/coins/{coin_id}/market_chart/range"
+    params = {"vs_currency": "usd", "from": from_ts // 1000, "to": to_ts // 1000}
+    r = session.get(url, params=params, timeout=15, endpoint="market_chart/range")
+    if r.status_code != 200:
+        log.warning("CoinGecko %s: HTTP %s", coin_id, r.status_code)
+        return None
+    # Boş DataFrame = aralıkta veri yok (ör. listelenmeden önce); None = başarısız
+    return parse_market_chart(r.content)
+
+
+def fetch_simple_prices(coin_ids):
+    # Canlı mod: tüm coin'lerin son fiyatı tek istekte → {id: (ts_ms, fiyat)}
+    params = {"ids": ",".join(coin_ids), "vs_currencies": "usd", "include_last_updated_at": "true"}
+    r = session.get(f"{COINGECKO_URL}/simple/price", params=params, timeout=10, endpoint="simple/price")
+    if r.status_code != 200:
+        log.warning("CoinGecko simple/price: HTTP %s", r.status_code)
+        return {}
+    out = {}
+    for coin_id, row in r.json().items():
+        if "usd" in row:
+            ts = int(row.get("last_updated_at") or time.time()) * 1000
+            out[coin_id] = (ts, float(row["usd"]))
+    return out
+
+
+CryptoPlan = namedtuple("CryptoPlan", ["coin_id", "interval", "step", "start_ts", "chunks", "now"])
+
+
+def crypto_plan(coin_id, days, warmup_rows=0, max_age=REFRESH_SECONDS, interval=None):
+    # Çözünürlük gösterilen pencereye göre (ya da bar grafiği için verilen); ısınma satırları aynı çözünürlükte
+    interval = interval or coingecko_interval(days)
+    step = INTERVAL_MS[interval]
+    now = _now_ms()
+    start_ts = now - days * DAY_MS - warmup_rows * step
+    gaps, _, _ = _plan(store.coverage("coingecko", coin_id, interval), start_ts, now, step, max_age)
+    if interval in FINE_HISTORY_MS:
+        # Bu çözünürlükte verilmeyen eski kısım istenmez (saatlik satır 5m seriye karışmasın)
+        floor = now - FINE_HISTORY_MS[interval]
+        gaps = [(max(f, floor), t) for f, t in gaps if t > floor]
+    chunks = list(_chunks(gaps, RANGE_SPAN_MS[interval]))
+    return CryptoPlan(coin_id, interval, step, start_ts, chunks, now)
+
+
+def store_crypto_chunks(plan, results):
+    # results: plan.chunks sırasıyla DataFrame (boş olabilir) ya da None (başarısız).
+    # Kapsam sadece mevcut kapsama bitişik başarılı parçalarla büyür: baş parçası
+    # gelmediyse first_ts, kuyruk parçası gelmediyse fetched_at ilerlemez → boşluk
+    # sonraki planda yeniden çekilir. Bitişik olmayan parçalar atılır.
+    cov = store.coverage("coingecko", plan.coin_id, plan.interval)
+    lo, hi = (cov.first_ts, cov.last_ts) if cov else (None, None)
+    fetched_at = cov.fetched_at if cov else 0.0
+    pending = [(f, t, df) for (f, t), df in zip(plan.chunks, results) if df is not None]
+    frames = []
+    grew = True
+    while pending and grew:
+        grew = False
+        for chunk in list(pending):
+            f, t, df = chunk
+            if lo is not None and (t < lo - plan.step or f > hi + plan.step):
+                continue
+            lo = f if lo is None else min(lo, f)
+            hi = t if hi is None else max(hi, t)
+            if t >= plan.now:
+                fetched_at = None  # kuyruk geldi → şimdi
+            frames.append(df)
+            pending.remove(chunk)
+            grew = True
+    if not frames:
+        return False
+    df = pd.concat(frames).sort_index(kind="stable")
+    store.write("coingecko", plan.coin_id, plan.interval, _bucket_last(df, plan.step) if len(df) else df, lo, fetched_at)
+    return True
+
+
+def read_crypto(plan):
+    return read_close("coingecko", plan.coin_id, plan.interval, plan.start_ts)
+
+
+def load_crypto_history(coin_id, days, warmup_rows=0, max_age=REFRESH_SECONDS, interval=None):
+    plan = crypto_plan(coin_id, days, warmup_rows, max_age, interval)
+    results = []
+    for from_ts, to_ts in plan.chunks:
+        try:
+            results.append(fetch_market_chart_range(coin_id, from_ts, to_ts))
+        except Exception as e:
+            metrics.error("coingecko.chunk", e, coin_id)
+            results.append(None)
+    store_crypto_chunks(plan, results)
+    return read_crypto(plan)
+
+
+# -------------------------------------------------
+# HİSSE (yfinance günlük bar → depo)
+# -------------------------------------------------
+def _date_range(from_ts, to_ts):
+    start = datetime.fromtimestamp(from_ts / 1000, tz=timezone.utc).date()
+    end = datetime.fromtimestamp(to_ts / 1000, tz=timezone.utc).date() + timedelta(days=1)
+    return start, end
+
+
+def _clean_history(df):
+    df = df.dropna(how="all")
+    if df.empty:
+        return _frame(np.empty(0, dtype="int64"), np.empty(0))
+    # Seans tarihi 00:00 UTC olarak saklanır
+    index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    df = df.set_axis(index.normalize().tz_localize("UTC"))
+    return df[[c for c in ["Open", "High", "Low", "Close", "Volume"] if c in df.columns]]
+
+
+def _yf():
+    # yfinance'in importu ağır (~200 ms): sadece hisse verisi ilk istendiğinde yüklenir
+    import yfinance
+    return yfinance
+
+
+@contextmanager
+def _yahoo_call(endpoint):
+    # yfinance HTTP kodunu dışarı vermez: başarılı → "ok", istisna → istisna türü
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        metrics.upstream("yahoo", endpoint, type(e).__name__, time.perf_counter() - t0)
+        raise
+    metrics.upstream("yahoo", endpoint, "ok", time.perf_counter() - t0)
+
+
+def _download_histories(symbols, from_ts, to_ts):
+    # Tüm semboller tek yf.download isteğinde
+    start, end = _date_range(from_ts, to_ts)
+    with _yahoo_call("download"):
+        data = _yf().download(symbols, start=start, end=end, interval="1d", group_by="ticker",
+                              auto_adjust=True, threads=True, progress=False)
+    if data is None or data.empty:
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {symbols[0]: _clean_history(data)}
+    return {sym: _clean_history(data[sym]) for sym in symbols if sym in data.columns.get_level_values(0)}
+
+
+def load_stock_histories(symbols, days, warmup_rows=0, max_age=REFRESH_SECONDS):
+    # Birden çok hisse: eksik olanlar tek toplu istekte çekilir
+    now = _now_ms()
+    start_ts = now - (days + stock_warmup_days(warmup_rows)) * DAY_MS
+
+    plans = {}
+    for sym in dict.fromkeys(symbols):
+        gaps, first_ts, fetched_at = _plan(store.coverage("yahoo", sym, "1d"), start_ts, now, DAY_MS, max_age)
+        if gaps:
+            plans[sym] = (gaps, first_ts, fetched_at)
+
+    if plans:
+        from_ts = min(g[0] for gaps, _, _ in plans.values() for g in gaps)
+        to_ts = max(g[1] for gaps, _, _ in plans.values() for g in gaps)
+        try:
+            frames = _download_histories(list(plans), from_ts, to_ts)
+            for sym, df in frames.items():
+                _, first_ts, fetched_at = plans[sym]
+                store.write("yahoo", sym, "1d", df, first_ts, fetched_at)
+        except Exception as e:
+            metrics.error("yahoo.download", e, f"{len(plans)} sembol")
+
+    return {sym: read_close("yahoo", sym, "1d", start_ts) for sym in symbols}
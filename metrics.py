@@ -0,0 +1,238 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Ölçümler (process başına tek kayıt defteri)
+# -------------------------------------------------
+# Aşama süreleri histogram olarak, upstream durum kodları / tekrar denemeler
+# ve önbellek isabetleri sayaç olarak tutulur. Prometheus metin formatında
+# yerel bir uç noktadan (METRICS_HOST:METRICS_PORT/metrics) okunur; "0" kapatır.
+# Ayrıca o anki rerun'ın aşama süreleri thread'e bağlı bir listeye yazılır
+# (sidebar'daki debug paneli için).
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9464))
+PREFIX = "app_"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TRACE_LIMIT = 500  # canlı modda fragment'ler tam rerun olmadan ekler
+
+_lock = threading.Lock()
+_counters = {}    # (ad, etiketler) → değer
+_histograms = {}  # (ad, etiketler) → [kova sayaçları..., toplam, adet]
+_help = {}
+_collectors = []  # çağrıldığında (ad, tür, etiketler, değer) üreten fonksiyonlar
+_local = threading.local()
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def count(name, value=1, help=None, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+        if help:
+            _help.setdefault(name, help)
+
+
+def observe(name, seconds, help=None, **labels):
+    key = _key(name, labels)
+    with _lock:
+        h = _histograms.get(key)
+        if h is None:
+            h = _histograms[key] = [0] * (len(BUCKETS) + 2)
+            if help:
+                _help.setdefault(name, help)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h[i] += 1
+                break
+        h[-2] += seconds
+        h[-1] += 1
+
+
+@contextmanager
+def stage(name):
+    # Aşama süresi → stage_seconds{stage} + bu rerun'ın izi; hata olsa da kaydedilir
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        observe("stage_seconds", elapsed, help="Aşama süresi (sn)", stage=name)
+        trace = getattr(_local, "trace", None)
+        if trace is not None and len(trace) < TRACE_LIMIT:
+            trace.append((name, elapsed))
+
+
+def upstream(name, endpoint, status, seconds):
+    # Tek HTTP denemesi; status: HTTP kodu ya da "error" (bağlantı/zaman aşımı)
+    count("upstream_requests_total", help="Upstream istekleri (durum koduna göre)",
+          upstream=name, endpoint=endpoint, status=str(status))
+    observe("upstream_request_seconds", seconds, help="Upstream istek süresi (sn)", upstream=name, endpoint=endpoint)
+
+
+def retry(name, endpoint, reason):
+    count("upstream_retries_total", help="Upstream tekrar denemeleri", upstream=name, endpoint=endpoint, reason=reason)
+
+
+def error(where, exc, subject=""):
+    # Yutulan hatalar görünür olsun: log + sayaç (subject sadece logda, etiket değil)
+    count("errors_total", help="Yakalanıp devam edilen hatalar", where=where, type=type(exc).__name__)
+    log.warning("%s %s: %s", where, subject, exc, exc_info=log.isEnabledFor(logging.DEBUG))
+
+
+def cache_hit(cache, hit):
+    count("cache_hits_total" if hit else "cache_misses_total", cache=cache)
+
+
+def register(collector):
+    # collector() → [(ad, "counter"|"gauge", etiketler, değer), ...]; okuma anında çağrılır
+    with _lock:
+        _collectors.append(collector)
+
+
+def register_cache(name, cache):
+    # ColumnCache sayaçları diğer önbelleklerle aynı metrik adlarıyla
+    def collect():
+        s = cache.stats()
+        labels = dict(cache=name)
+        return [("cache_hits_total", "counter", labels, s["hits"]),
+                ("cache_misses_total", "counter", labels, s["misses"]),
+                ("cache_evictions_total", "counter", labels, s["evictions"]),
+                ("cache_entries", "gauge", labels, s["entries"]),
+                ("cache_bytes", "gauge", labels, s["nbytes"]),
+                ("cache_max_bytes", "gauge", labels, s["max_bytes"])]
+    register(collect)
+
+
+# -------------------------------------------------
+# Rerun izi (debug paneli)
+# -------------------------------------------------
+def begin_trace():
+    _local.trace = []
+    return _local.trace
+
+
+def current_trace():
+    # → [(aşama, adet, toplam sn)], ilk görülme sırasıyla
+    out = {}
+    for name, seconds in getattr(_local, "trace", None) or []:
+        n, total = out.get(name, (0, 0.0))
+        out[name] = (n + 1, total + seconds)
+    return [(name, n, total) for name, (n, total) in out.items()]
+
+
+def snapshot(name):
+    # Tek metrik ailesinin o anki değerleri: {etiketler: değer} (debug paneli için)
+    with _lock:
+        values = {labels: v for (n, labels), v in _counters.items() if n == name}
+        collectors = list(_collectors)
+    for collect in collectors:
+        for n, _, labels, v in collect():
+            if n == name:
+                values[tuple(sorted(labels.items()))] = v
+    return values
+
+
+# -------------------------------------------------
+# Prometheus metin formatı + yerel uç nokta
+# -------------------------------------------------
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in items)
+    return "{" + body + "}"
+
+
+def render():
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: list(v) for k, v in _histograms.items()}
+        helps = dict(_help)
+        collectors = list(_collectors)
+
+    families = {}  # ad → (tür, [(etiketler, değer)])
+    for (name, labels), v in counters.items():
+        families.setdefault(name, ("counter", []))[1].append((labels, v))
+    for collect in collectors:
+        try:
+            rows = collect()
+        except Exception as e:
+            log.warning("metrik toplayıcı başarısız: %s", e)
+            continue
+        for name, kind, labels, v in rows:
+            families.setdefault(name, (kind, []))[1].append((tuple(sorted(labels.items())), v))
+
+    lines = []
+    for name in sorted(families):
+        kind, rows = families[name]
+        if name in helps:
+            lines.append(f"# HELP {PREFIX}{name} {helps[name]}")
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+        for labels, v in sorted(rows):
+            lines.append(f"{PREFIX}{name}{_labels(labels)} {v}")
+
+    for name in sorted({n for n, _ in histograms}):
+        if name in helps:
+            lines.append(f"# HELP {PREFIX}{name} {helps[name]}")
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for (n, labels), h in sorted(histograms.items()):
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, c in zip(BUCKETS, h):
+                cumulative += c
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels, [('le', '+Inf')])} {h[-1]}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {h[-2]}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {h[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve(host=METRICS_HOST, port=METRICS_PORT):
+    # Her rerun'da çağrılabilir; sunucu process başına bir kez başlar
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _Handler)
+            except OSError as e:
+                # Aynı makinede ikinci process: port dolu, metrikler ilk process'ten
+                log.warning("Metrik uç noktası açılamadı (%s:%s): %s", host, port, e)
+                _server = False
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            log.info("Metrikler: http://%s:%s/metrics", host, _server.server_address[1])
+        return _server or None
@@ -0,0 +1,146 @@
+import logging
+import math
+import os
+import threading
+import time
+
+import indicators
+import market_data
+import metrics
+import universe
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Arka plan ön yükleme (sunucu process'i başına tek thread)
+# -------------------------------------------------
+# Top‑N coin ve BIST 100 serileri, sayfaların TTL'i dolmadan depoda
+# tazelenir; sayfa render'ı depodan okumaya indirgenir. CoinGecko bütçesi
+# kullanıcı istekleriyle aynı TokenBucket'tan düşer, scheduler ise bütçenin
+# sadece PREFETCH_BUDGET_SHARE kadarını kullanacak şekilde kendini yavaşlatır.
+PREFETCH_ENABLED = os.environ.get("PREFETCH", "1") != "0"
+PREFETCH_BUDGET_SHARE = float(os.environ.get("PREFETCH_BUDGET_SHARE", 0.5))
+# Sayfaların istediği en uzun pencere, çözünürlük başına (1 gün → 5m, 90 → 1h, 365 → 1d)
+PREFETCH_WINDOWS = (1, 90, 365)
+STOCK_DAYS = 365
+# Seriler REFRESH_SECONDS dolmadan önce tazelenir (sayfa hiç bayat görmesin)
+LEAD = 0.8
+# İlk döngü (yfinance importu + toplu indirme) yeni process'in ilk sayfa çizimiyle yarışmasın
+PREFETCH_START_DELAY = float(os.environ.get("PREFETCH_START_DELAY", 10))
+
+
+def budget_top_n(rate_per_min=market_data.COINGECKO_RATE_PER_MIN, share=PREFETCH_BUDGET_SHARE):
+    # Bir döngüde (≈ REFRESH_SECONDS × LEAD) bütçeye sığan coin sayısı; coin başına pencere kadar istek
+    per_cycle = rate_per_min / 60 * share * market_data.REFRESH_SECONDS * LEAD - 1  # -1: coin listesi
+    return max(1, min(250, math.floor(per_cycle / len(PREFETCH_WINDOWS))))
+
+
+class PrefetchScheduler:
+    def __init__(self, top_n=None, share=PREFETCH_BUDGET_SHARE, bist_symbols=None):
+        self.top_n = top_n or int(os.environ.get("PREFETCH_TOP_N", 0)) or budget_top_n(share=share)
+        self.share = share
+        self.bist_symbols = sorted(set(bist_symbols or market_data.BIST100))
+        self.bucket = market_data.session.bucket
+        self.max_age = market_data.REFRESH_SECONDS * LEAD
+        self.coin_ids = []
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = dict(cycles=0, requests=0, errors=0, last_cycle_s=0.0)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _pace(self, requests):
+        # Kovanın güncel (429 sonrası yavaşlamış olabilir) hızının payı kadar
+        if requests:
+            self.stats["requests"] += requests
+            self._stop.wait(requests / (self.bucket.rate * self.share))
+
+    def _refresh_coins(self):
+        # Sayfalarla aynı coin evreni: sadece bayatsa istek atılır
+        self._pace(universe.coins.refresh())
+        self.coin_ids = universe.coins.top(self.top_n)
+
+    def _prefetch_crypto(self, coin_id, days):
+        plan = market_data.crypto_plan(coin_id, days, indicators.WARMUP_ROWS, self.max_age)
+        results = []
+        for from_ts, to_ts in plan.chunks:
+            if self._stop.is_set():
+                break
+            results.append(market_data.fetch_market_chart_range(coin_id, from_ts, to_ts))
+            self._pace(1)
+        # Durdurulduysa gelen parçalar yine yazılır (gelmeyenler kapsam dışı kalır)
+        if results:
+            market_data.store_crypto_chunks(plan, results)
+
+    def run_once(self):
+        t0 = time.time()
+        # BIST: tek toplu yf.download (CoinGecko bütçesinden düşmez)
+        try:
+            market_data.load_stock_histories(self.bist_symbols, STOCK_DAYS, indicators.WARMUP_ROWS, self.max_age)
+        except Exception as e:
+            self.stats["errors"] += 1
+            metrics.error("prefetch.bist", e)
+
+        try:
+            self._refresh_coins()
+        except Exception as e:
+            self.stats["errors"] += 1
+            metrics.error("prefetch.coins", e)
+        for coin_id in self.coin_ids:
+            for days in PREFETCH_WINDOWS:
+                if self._stop.is_set():
+                    return
+                try:
+                    self._prefetch_crypto(coin_id, days)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    metrics.error("prefetch.crypto", e, coin_id)
+
+        self.stats["cycles"] += 1
+        self.stats["last_cycle_s"] = elapsed = time.time() - t0
+        if elapsed > self.max_age:
+            log.warning("Ön yükleme döngüsü %.0f sn sürdü (> %.0f sn); PREFETCH_TOP_N düşürülmeli",
+                        elapsed, self.max_age)
+
+    def _run(self):
+        if self._stop.wait(PREFETCH_START_DELAY):
+            return
+        log.info("Ön yükleme başladı: top %d coin, %d hisse", self.top_n, len(self.bist_symbols))
+        while not self._stop.is_set():
+            t0 = time.time()
+            self.run_once()
+            # Sonraki döngü: en eski seri tazelenme eşiğine geldiğinde
+            self._stop.wait(max(1.0, self.max_age - (time.time() - t0)))
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start():
+    # Her rerun'da çağrılabilir; thread sunucu başına bir kez başlar
+    global _scheduler
+    if not PREFETCH_ENABLED:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler().start()
+            metrics.register(_collect)
+        return _scheduler
+
+
+def _collect():
+    stats = _scheduler.stats
+    return [("prefetch_cycles_total", "counter", {}, stats["cycles"]),
+            ("prefetch_requests_total", "counter", {}, stats["requests"]),
+            ("prefetch_errors_total", "counter", {}, stats["errors"]),
+            ("prefetch_last_cycle_seconds", "gauge", {}, stats["last_cycle_s"])]
@@ -0,0 +1,65 @@
+import threading
+from collections import OrderedDict
+
+
+# -------------------------------------------------
+# Bayt bütçeli LRU önbellek (process başına ortak)
+# -------------------------------------------------
+# Değerler NumPy dizileri olarak saklanır, kopyalanmaz/pickle'lanmaz. Toplam
+# boyut max_bytes'ı aşınca en uzun süredir kullanılmayanlar atılır. version:
+# değerin hangi depo durumundan kurulduğu (ör. Coverage); uyuşmazsa kayıt bayat.
+class ColumnCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key → (version, value, nbytes)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, version=None, accept=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or (accept is not None and not accept(entry[1])):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value, nbytes, version=None):
+        # Aynı anahtar yeniden konursa (ör. seri büyüdü) boyut güncellenir
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (version, value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return dict(entries=len(self._entries), nbytes=self.nbytes, max_bytes=self.max_bytes,
+                        hits=self.hits, misses=self.misses, evictions=self.evictions,
+                        hit_rate=self.hits / total if total else 0.0)
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+# -------------------------------------------------
+# Kalıcı fiyat deposu (SQLite)
+# -------------------------------------------------
+# Tüm sayfalar aynı dosyadan okur. Anahtar: (source, symbol, interval).
+# ts = UTC epoch milisaniye (günlük barlarda seans tarihi 00:00 UTC).
+
+DEFAULT_PATH = os.environ.get(
+    "PRICE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices.sqlite"),
+)
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+Coverage = namedtuple("Coverage", ["first_ts", "last_ts", "fetched_at"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    source   TEXT    NOT NULL,
+    symbol   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    open     REAL,
+    high     REAL,
+    low      REAL,
+    close    REAL    NOT NULL,
+    volume   REAL,
+    PRIMARY KEY (source, symbol, interval, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS coverage (
+    source     TEXT    NOT NULL,
+    symbol     TEXT    NOT NULL,
+    interval   TEXT    NOT NULL,
+    first_ts   INTEGER NOT NULL,
+    last_ts    INTEGER NOT NULL,
+    fetched_at REAL    NOT NULL,
+    PRIMARY KEY (source, symbol, interval)
+) WITHOUT ROWID;
+"""
+
+
+def to_epoch_ms(index):
+    # DatetimeIndex -> int64 ms (tz'siz index UTC kabul edilir)
+    idx = pd.DatetimeIndex(index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return idx.as_unit("ms").asi8
+
+
+class PriceStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Her çağrıda yeni bağlantı: thread'ler ve process'ler arası güvenli
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def coverage(self, source, symbol, interval):
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT first_ts, last_ts, fetched_at FROM coverage "
+                "WHERE source=? AND symbol=? AND interval=?",
+                (source, symbol, interval),
+            ).fetchone()
+        return Coverage(*row) if row else None
+
+    def read(self, source, symbol, interval, start_ts=None):
+        sql = ("SELECT ts, open, high, low, close, volume FROM bars "
+               "WHERE source=? AND symbol=? AND interval=?")
+        args = [source, symbol, interval]
+        if start_ts is not None:
+            sql += " AND ts>=?"
+            args.append(int(start_ts))
+        sql += " ORDER BY ts"
+        with self._connect() as con:
+            rows = con.execute(sql, args).fetchall()
+
+        arr = np.array(rows, dtype="float64").reshape(-1, 6)
+        index = pd.DatetimeIndex(arr[:, 0].astype("int64").view("M8[ms]"), name="timestamp").tz_localize("UTC")
+        df = pd.DataFrame(arr[:, 1:], index=index, columns=COLUMNS)
+        df = df.dropna(axis=1, how="all")
+        # Göstergelerin artımlı durumu bu anahtarla eşleşir
+        df.attrs["series_key"] = (source, symbol, interval)
+        return df
+
+    def write(self, source, symbol, interval, df, first_ts, fetched_at=None):
+        # df: DatetimeIndex + COLUMNS'tan en az "Close"
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        df = df[df["Close"].notna()]
+        ts = to_epoch_ms(df.index)
+        cols = [df[c].to_numpy(dtype="float64") if c in df.columns else np.full(len(df), np.nan)
+                for c in COLUMNS]
+        rows = [
+            (source, symbol, interval, int(t), *[None if np.isnan(v) else float(v) for v in vals])
+            for t, *vals in zip(ts, *cols)
+        ]
+        last_ts = int(ts.max()) if len(ts) else int(first_ts)
+
+        with self._lock, self._connect() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO bars (source, symbol, interval, ts, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            con.execute(
+                "INSERT INTO coverage (source, symbol, interval, first_ts, last_ts, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (source, symbol, interval) DO UPDATE SET "
+                "first_ts=MIN(first_ts, excluded.first_ts), "
+                "last_ts=MAX(last_ts, excluded.last_ts), "
+                "fetched_at=excluded.fetched_at",
+                (source, symbol, interval, int(first_ts), last_ts, fetched_at),
+            )
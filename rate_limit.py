@@ -0,0 +1,162 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import metrics
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Token bucket (tüm thread'ler aynı bütçeyi paylaşır)
+# -------------------------------------------------
+class TokenBucket:
+    def __init__(self, rate, capacity, min_rate=None):
+        self.max_rate = rate              # saniyedeki istek
+        self.rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self):
+        # Jeton alındıysa 0, yoksa beklenecek saniye (asyncio tarafı için)
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        # Jeton yoksa sadece gerekli süre kadar bekle (sabit sleep yok)
+        t0 = None
+        with self._cond:
+            while True:
+                wait = self.try_acquire()
+                if wait <= 0:
+                    break
+                t0 = t0 or time.perf_counter()
+                self._cond.wait(wait)
+        if t0 is not None:
+            metrics.observe("ratelimit_wait_seconds", time.perf_counter() - t0, help="Jeton için beklenen süre (sn)")
+
+    def pause(self, seconds):
+        # 429 / Retry-After: bütün istemciler birlikte bekler
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    def slow_down(self):
+        with self._cond:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        # Başarılı isteklerle hız yavaşça eski değerine döner
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+def retry_after_seconds(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, response=None, backoff=1.0, max_backoff=60.0):
+    delay = retry_after_seconds(response) if response is not None else None
+    if delay is None:
+        # "Full jitter": 0 ile üstel sınır arasında rastgele
+        delay = random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+    return delay
+
+
+def retry_delay(bucket, name, endpoint, attempt, max_retries, elapsed, response=None, error=None,
+                backoff=1.0, max_backoff=60.0):
+    # Tek denemenin sonucu (yanıt ya da istisna) → yeniden denemeden önce beklenecek
+    # saniye, ya da None: yanıt döndürülür / istisna yükseltilir. Senkron session ve
+    # async backend aynı kararı verir (429 / 5xx / bağlantı hatası, metrikler, bucket)
+    if error is not None:
+        metrics.upstream(name, endpoint, "error", elapsed)
+        if attempt == max_retries:
+            return None
+        log.warning("%s %s → %s (deneme %d)", name, endpoint, error, attempt + 1)
+        metrics.retry(name, endpoint, "error")
+        return backoff_delay(attempt, None, backoff, max_backoff)
+    metrics.upstream(name, endpoint, response.status_code, elapsed)
+
+    if response.status_code == 429:
+        # Bekleme bucket'ta: tüm istemciler birlikte durur, çağıran ayrıca uyumaz
+        bucket.slow_down()
+        delay = backoff_delay(attempt, response, backoff, max_backoff)
+        log.warning("429 %s %s → %.1f sn bekleniyor (deneme %d)", name, endpoint, delay, attempt + 1)
+        bucket.pause(delay)
+        if attempt == max_retries:
+            return None
+        metrics.retry(name, endpoint, "429")
+        return 0.0
+    if response.status_code >= 500 and attempt < max_retries:
+        metrics.retry(name, endpoint, "5xx")
+        return backoff_delay(attempt, response, backoff, max_backoff)
+
+    bucket.speed_up()
+    return None
+
+
+# -------------------------------------------------
+# Rate‑limit dostu session
+# -------------------------------------------------
+class RateLimitedSession:
+    # requests.Session önüne: token bucket + Retry-After + jitter'lı üstel geri çekilme
+    def __init__(self, session, bucket, max_retries=4, backoff=1.0, max_backoff=60.0, name="coingecko"):
+        self.name = name  # metriklerdeki upstream etiketi
+        self.session = session
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def get(self, url, endpoint="other", **kwargs):
+        # endpoint: metrik etiketi (coin id'siz yol şablonu, ör. "market_chart/range")
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            t0 = time.perf_counter()
+            r = error = None
+            try:
+                r = self.session.get(url, **kwargs)
+            except Exception as e:
+                error = e
+            delay = retry_delay(self.bucket, self.name, endpoint, attempt, self.max_retries,
+                                time.perf_counter() - t0, r, error, self.backoff, self.max_backoff)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return r
+            if delay:
+                time.sleep(delay)
@@ -0,0 +1,207 @@
+import argparse
+import csv
+import importlib.util
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import charts
+import indicators
+from price_store import DEFAULT_PATH
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Gece raporu: başsız toplu SMA tabloları + statik grafikler
+# -------------------------------------------------
+# Uygulamayla aynı kaynak → depo → gösterge → grafik hattı. Çekim ana
+# process'te (tek token kovası; BIST tek yf.download, kripto async backend)
+# partiler halinde yapılır, her parti gelir gelmez process havuzuna verilir:
+# SMA + Parquet + HTML/PNG yazımı (CPU) sonraki partinin çekimiyle örtüşür.
+# Worker'lar ağa ve depoya dokunmaz.
+#
+# Çıktı: <out>/<tarih>/<kaynak>/<sembol>.parquet|.html|.png + timings.csv.
+# Parquet en son (atomik) yazılır; yeniden çalıştırmada Parquet'i (ve istenen
+# grafikleri) olan semboller atlanır → yarıda kalan gece çalışması kaldığı
+# yerden devam eder.
+#
+#   python report.py
+#   python report.py --sources coingecko --top-n 250 --workers 8 --png
+#   python report.py --date 2026-01-31 --force
+REPORT_DIR = os.path.join(os.path.dirname(DEFAULT_PATH), "reports")
+TIMING_FIELDS = ["source", "symbol", "rows", "sma_ms", "parquet_ms", "html_ms", "png_ms", "total_ms", "status"]
+PNG_SIZE = dict(width=1600, height=700)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BIST 100 + top-N coin için SMA tabloları (Parquet) ve grafikler (HTML/PNG)")
+    parser.add_argument("--sources", default="yahoo,coingecko", help="virgülle: yahoo, coingecko, local")
+    parser.add_argument("--top-n", type=int, default=100, help="kripto: piyasa değerine göre ilk N coin")
+    parser.add_argument("--days", type=int, default=365, help="gösterilen pencere (SMA ısınması ayrıca yüklenir)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process havuzu boyutu")
+    parser.add_argument("--batch", type=int, default=25, help="tek seferde çekilip havuza verilen sembol sayısı")
+    parser.add_argument("--out", default=REPORT_DIR)
+    parser.add_argument("--date", default=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                        help="çalışma klasörü (aynı tarihle tekrar çalıştırma kaldığı yerden devam eder)")
+    parser.add_argument("--no-html", dest="html", action="store_false", help="HTML grafik yazma")
+    parser.add_argument("--png", action="store_true", help="PNG grafik de yaz (kaleido gerekir)")
+    parser.add_argument("--force", action="store_true", help="tamamlanmış sembolleri de yeniden üret")
+    args = parser.parse_args()
+    if args.png and importlib.util.find_spec("kaleido") is None:
+        parser.error("PNG çıktısı için kaleido gerekli: pip install kaleido")
+    return args
+
+
+def _outputs(run_dir, source_name, symbol, html, png):
+    base = os.path.join(run_dir, source_name, symbol)
+    paths = {"parquet": base + ".parquet"}
+    if html:
+        paths["html"] = base + ".html"
+    if png:
+        paths["png"] = base + ".png"
+    return paths
+
+
+def _write(path, write):
+    # Yarım dosya bırakmamak için önce geçici ada
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+# -------------------------------------------------
+# Worker: tek sembol → SMA tablosu + grafikler (ağ / depo yok)
+# -------------------------------------------------
+def render_symbol(source_name, symbol, title, price_name, df, start, paths):
+    timing = dict(source=source_name, symbol=symbol, rows=0, sma_ms="", parquet_ms="", html_ms="", png_ms="")
+    t_total = t0 = time.perf_counter()
+    frame = indicators.sma_frame(df, start)
+    timing["rows"] = len(frame)
+    timing["sma_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    if frame.empty:
+        timing.update(total_ms=round((time.perf_counter() - t_total) * 1000, 1), status="veri yok")
+        return timing
+
+    if "html" in paths or "png" in paths:
+        fig = charts.price_figure("full", charts.downsample(frame, charts.FULL_WIDTH_POINTS),
+                                  f"{title} – Son {len(frame)} Bar", price_name=price_name, yaxis_title=price_name)
+        if "html" in paths:
+            t0 = time.perf_counter()
+            _write(paths["html"], lambda p: fig.write_html(p, include_plotlyjs="cdn"))
+            timing["html_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        if "png" in paths:
+            t0 = time.perf_counter()
+            _write(paths["png"], lambda p: fig.write_image(p, format="png", **PNG_SIZE))
+            timing["png_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+
+    # Parquet son: varlığı sembolün tamamlandığını gösterir
+    t0 = time.perf_counter()
+    _write(paths["parquet"], lambda p: frame.to_parquet(p))
+    timing["parquet_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    timing.update(total_ms=round((time.perf_counter() - t_total) * 1000, 1), status="ok")
+    return timing
+
+
+# -------------------------------------------------
+# Ana process: sembol listeleri → parti parti çekim → havuz
+# -------------------------------------------------
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # Ağ / depo katmanı sadece ana process'te (spawn ile açılan worker'lar bunları yüklemez)
+    import data_sources
+
+    run_dir = os.path.join(args.out, args.date)
+    sources = [data_sources.SOURCES[name.strip()] for name in args.sources.split(",") if name.strip()]
+
+    jobs = []  # (kaynak, sembol, başlık, çıktı yolları)
+    skipped = 0
+    for source in sources:
+        symbols, warning = source.list_symbols()
+        if warning:
+            log.warning("%s: %s", source.title, warning)
+        labels = symbols.labels[:args.top_n] if source.name == "coingecko" else symbols.labels
+        os.makedirs(os.path.join(run_dir, source.name), exist_ok=True)
+        for label in labels:
+            sym = symbols.ids[label]
+            paths = _outputs(run_dir, source.name, sym, args.html, args.png)
+            if not args.force and all(os.path.exists(p) for p in paths.values()):
+                skipped += 1
+                continue
+            jobs.append((source, sym, label, paths))
+    log.info("%d sembol işlenecek, %d tamamlanmış (atlandı) → %s", len(jobs), skipped, run_dir)
+
+    timings_path = os.path.join(run_dir, "timings.csv")
+    new_file = not os.path.exists(timings_path)
+    os.makedirs(run_dir, exist_ok=True)
+    fetch_s = {}
+    counts = dict(ok=0, empty=0, error=0)
+    t_run = time.perf_counter()
+    with open(timings_path, "a", newline="") as f, \
+            ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        writer = csv.DictWriter(f, fieldnames=TIMING_FIELDS)
+        if new_file:
+            writer.writeheader()
+        futures = {}
+        for i in range(0, len(jobs), args.batch):
+            batch = jobs[i:i + args.batch]
+            # Parti tek kaynaktan olmayabilir: kaynak başına tek toplu çekim
+            for source in dict.fromkeys(job[0] for job in batch):
+                part = [job for job in batch if job[0] is source]
+                t0 = time.perf_counter()
+                # max_staleness=0: rapor bayat seri kullanmaz, eskiyen her seri çekilir
+                histories = source.load_many([job[1] for job in part], args.days, indicators.WARMUP_ROWS,
+                                             max_staleness=0)
+                fetch_s[source.name] = fetch_s.get(source.name, 0.0) + time.perf_counter() - t0
+                price_name = f"Fiyat ({source.currency})" if source.currency else "Fiyat"
+                for _, sym, label, paths in part:
+                    df = histories.get(sym)
+                    if df is None or df.empty:
+                        writer.writerow(dict(source=source.name, symbol=sym, rows=0, status="veri yok"))
+                        counts["empty"] += 1
+                        log.warning("%s %s: veri alınamadı", source.name, sym)
+                        continue
+                    future = pool.submit(render_symbol, source.name, sym, label, price_name, df,
+                                         source.window_start(df, args.days), paths)
+                    futures[future] = (source.name, sym)
+            # Biten worker sonuçları çekim sürerken de yazılsın
+            for future in [fut for fut in futures if fut.done()]:
+                _record(writer, futures.pop(future), future, counts)
+            f.flush()
+        for future in as_completed(futures):
+            _record(writer, futures[future], future, counts)
+            f.flush()
+
+    elapsed = time.perf_counter() - t_run
+    fetch = ", ".join(f"{name} {s:.1f} sn" for name, s in fetch_s.items()) or "—"
+    log.info("Bitti: %d ok, %d veri yok, %d hata, %d atlandı · çekim: %s · toplam %.1f sn · %s",
+             counts["ok"], counts["empty"], counts["error"], skipped, fetch, elapsed, timings_path)
+    return 1 if counts["error"] else 0
+
+
+def _record(writer, key, future, counts):
+    source_name, sym = key
+    try:
+        timing = future.result()
+    except Exception as e:
+        timing = dict(source=source_name, symbol=sym, status=f"hata: {type(e).__name__}: {e}")
+    writer.writerow(timing)
+    if timing["status"] == "ok":
+        counts["ok"] += 1
+        log.info("%-10s %-24s %6d satır  sma %6.1f  parquet %6.1f  html %7s  png %7s  toplam %7.1f ms",
+                 source_name, sym, timing["rows"], timing["sma_ms"], timing["parquet_ms"],
+                 timing["html_ms"], timing["png_ms"], timing["total_ms"])
+    elif timing["status"].startswith("hata"):
+        counts["error"] += 1
+        log.error("%s %s: %s", source_name, sym, timing["status"])
+    else:
+        counts["empty"] += 1
+        log.warning("%s %s: %s", source_name, sym, timing["status"])
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
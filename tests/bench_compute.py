@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import charts  # noqa: E402
+import indicators  # noqa: E402
+
+
+def series(n, freq="h", seed=0):
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(size=n))
+    index = pd.date_range("2024-01-01", periods=n, freq=freq, tz="UTC", name="timestamp")
+    df = pd.DataFrame({"Close": close}, index=index)
+    df.attrs["series_key"] = ("bench", f"n{n}", freq)
+    return df
+
+
+def test_sma_matrix(benchmark):
+    close = series(10_000)["Close"].to_numpy()
+    assert benchmark(indicators.sma_matrix, close).shape[-1] == len(close)
+
+
+def test_sma_cached(benchmark):
+    df = series(10_000)
+    indicators.cached_sma_frame(df)
+    benchmark(indicators.cached_sma_frame, df)
+
+
+def test_figure_half(benchmark):
+    df = indicators.sma_frame(series(10_000))
+    charts.layout_template("half")
+    benchmark(lambda: charts.price_figure("half", charts.downsample(df, charts.HALF_WIDTH_POINTS), "bench"))
+
+
+def test_scan(benchmark):
+    histories = {f"s{k}": series(565, "D").iloc[k % 50:] for k in range(250)}
+    benchmark(indicators.scan_frame, histories, 5)
@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import async_fetch  # noqa: E402
+import indicators  # noqa: E402
+
+
+@pytest.mark.parametrize("n", [4, 16, 64])
+def test_fetch_fanout(benchmark, offline, cold, pytestconfig, n):
+    # Soğuk depoya n coin: tek async backend, paylaşılan token kovası
+    ids = [f"coin-{i}" for i in range(n)]
+    out = benchmark.pedantic(async_fetch.get_backend().load_crypto_histories,
+                             args=(ids, 90, indicators.WARMUP_ROWS), setup=cold,
+                             rounds=pytestconfig.getoption("--page-rounds"), warmup_rounds=1)
+    if not pytestconfig.getoption("--stub-error-rate"):
+        assert all(out[c] is not None for c in ids)
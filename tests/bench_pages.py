@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app_limitsiz2.py")
+PAGES = {"CRYPTO": "CRYPTO ANALYSIS", "BIST": "BIST ANALYSIS", "SINGLE": "SINGLE ANALYSIS", "SCANNER": "SCANNER",
+         "CORRELATION": "CORRELATION"}
+
+
+# -------------------------------------------------
+# Sayfa çizimi: soğuk (boş depo + boş önbellekler) ve sıcak (aynı sayfa tekrar)
+# -------------------------------------------------
+def _check(at):
+    assert not at.exception, at.exception[0].value
+    return at
+
+
+def _opened(cold, page=None):
+    # Uygulama varsayılan sayfada açılır, ardından depo / önbellekler boşaltılır
+    at = _check(AppTest.from_file(APP, default_timeout=300).run())
+    cold()
+    if page:
+        _check(at.sidebar.radio[0].set_value(page).run())
+    return at
+
+
+@pytest.mark.parametrize("key", PAGES)
+def test_page_cold(benchmark, offline, cold, pytestconfig, key):
+    at = benchmark.pedantic(lambda at: at.sidebar.radio[0].set_value(PAGES[key]).run(),
+                            setup=lambda: ((_opened(cold),), {}),
+                            rounds=pytestconfig.getoption("--page-rounds"), warmup_rounds=1)
+    _check(at)
+
+
+@pytest.mark.parametrize("key", PAGES)
+def test_page_warm(benchmark, offline, cold, pytestconfig, key):
+    at = benchmark.pedantic(lambda at: at.run(), setup=lambda: ((_opened(cold, PAGES[key]),), {}),
+                            rounds=pytestconfig.getoption("--page-rounds"), warmup_rounds=1)
+    _check(at)
@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+# Modüller ayarları import anında okur: metrik sunucusu ve ön yükleme kapalı,
+# depo / dosyalar geçici klasörde (data/ altına yazılmaz)
+_tmp = tempfile.mkdtemp(prefix="tests-")
+os.environ.setdefault("METRICS_PORT", "0")
+os.environ.setdefault("PREFETCH", "0")
+os.environ.setdefault("PRICE_STORE_PATH", os.path.join(_tmp, "prices.sqlite"))
+os.environ.setdefault("HISTORY_DIR", os.path.join(_tmp, "history"))
+os.environ.setdefault("UNIVERSE_PATH", os.path.join(_tmp, "universe.json"))
+os.environ.setdefault("LOCAL_DATA_DIR", os.path.join(_tmp, "local"))
+os.environ.setdefault("COINGECKO_RATE_PER_MIN", "60000")  # limiter değil uygulama test edilir
+
+
+def pytest_addoption(parser):
+    # Stub / replay ayarları (benchmarks/suite.py bunları geçirir; testlerde gecikme yok)
+    group = parser.getgroup("offline", "CoinGecko stub + yfinance replay")
+    group.addoption("--stub-latency", type=float, default=0.0, help="istek başına gecikme (sn)")
+    group.addoption("--stub-error-rate", type=float, default=0.0, help="429 enjekte edilen istek oranı")
+    group.addoption("--stub-retry-after", type=float, default=0.2, help="enjekte edilen 429'daki Retry-After (sn)")
+    group.addoption("--stub-seed", type=int, default=0)
+    group.addoption("--page-rounds", type=int, default=3, help="sayfa / fanout benchmark'larında tur sayısı")
+
+
+_offline = {}
+
+
+@pytest.fixture(scope="session")
+def offline(pytestconfig):
+    # CoinGecko yerel stub'dan, yfinance kayıtlı / türetilmiş barlardan (ağ yok).
+    # market_data toplama sırasında (bars üzerinden) yüklenmiş olabilir → adres modülde de
+    from coingecko_stub import serve
+
+    import market_data
+
+    opt = pytestconfig.getoption
+    server, url = serve(latency=opt("--stub-latency"), error_rate=opt("--stub-error-rate"),
+                        retry_after=opt("--stub-retry-after"), seed=opt("--stub-seed"))
+    os.environ["COINGECKO_URL"] = url
+    market_data.COINGECKO_URL = url
+    import yahoo_replay
+
+    replay = yahoo_replay.install(latency=opt("--stub-latency"), error_rate=opt("--stub-error-rate"),
+                                  seed=opt("--stub-seed"))
+    _offline.update(stub=server.RequestHandlerClass, replay=replay)
+    import data_sources
+
+    yield data_sources
+    yahoo_replay.uninstall()
+    server.shutdown()
+
+
+@pytest.fixture
+def cold(tmp_path_factory):
+    # Çağrıldıkça yeni boş depo + tüm process içi önbellekler temiz (soğuk ölçüm)
+    import streamlit as st
+
+    import history_files
+    import indicators
+    import live_feed
+    import market_data
+    import universe
+    from price_store import PriceStore
+
+    def reset():
+        base = tmp_path_factory.mktemp("cold")
+        market_data.store = PriceStore(str(base / "prices.sqlite"))
+        history_files.HISTORY_DIR = str(base / "history")
+        universe.coins = universe.CoinUniverse(str(base / "universe.json"))
+        market_data.price_cache.clear()
+        indicators._series.clear()
+        live_feed.prices._prices.clear()
+        st.cache_data.clear()
+
+    saved = market_data.store, history_files.HISTORY_DIR, universe.coins
+    yield reset
+    market_data.store, history_files.HISTORY_DIR, universe.coins = saved
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _offline:
+        stub, replay = _offline["stub"], _offline["replay"]
+        terminalreporter.write_line(f"CoinGecko stub: {sum(stub.hits.values())} istek, {stub.errors} adet 429, "
+                                    f"{stub.replayed} kayıttan · yfinance replay: {replay.calls} çağrı, "
+                                    f"{replay.errors} hata, {replay.replayed} sembol kayıttan")
+        if not stub.replayed and not replay.replayed:
+            # fixtures/ kaydedilmemiş: sonuçlar sadece sentetik seriler üzerinden
+            terminalreporter.write_line("Veri: sentetik (benchmarks/fixtures/ kaydı yok; --record ile kaydedin)")
@@ -0,0 +1,30 @@
+import pytest
+
+import bars
+import indicators
+
+CASES = [("coingecko", "coin-1", days, tf) for days in (30, 90, 365) for tf in ("4h", "1D", "1W")]
+CASES += [("yahoo", "AKBNK.IS", days, tf) for days in (30, 90, 365) for tf in ("1D", "1W")]
+
+
+@pytest.mark.parametrize("source_name, symbol, days, timeframe", CASES)
+def test_bar_frames_longest_sma_from_first_bar(offline, source_name, symbol, days, timeframe):
+    # Isınma bar cinsinden: en uzun SMA ilk gösterilen bardan itibaren dolu
+    source = offline.SOURCES[source_name]
+    frame = offline.load_frames(source, [symbol], days, timeframe=timeframe)[symbol]
+    assert frame is not None and len(frame)
+    longest = f"SMA{max(indicators.SMA_WINDOWS)}"
+    assert frame[longest].notna().all(), f"{longest} boş: {frame[longest].isna().sum()} / {len(frame)} bar"
+    assert {"Open", "High", "Low"} <= set(frame.columns)
+
+
+def test_resample_ohlc_weekly_starts_monday():
+    import numpy as np
+    import pandas as pd
+
+    index = pd.date_range("2024-01-03", periods=24 * 14, freq="h", tz="UTC")
+    df = pd.DataFrame({"Close": np.arange(len(index), dtype="float64")}, index=index)
+    out = bars.resample_ohlc(df, "1W")
+    assert (out.index[1:].dayofweek == 0).all()
+    first = df[df.index < out.index[1]]["Close"]
+    assert out.iloc[0].tolist() == [first.iloc[0], first.max(), first.min(), first.iloc[-1]]
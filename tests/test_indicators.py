@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+try:
+    import pandas_ta
+except ImportError:  # kurulu değilse aynı tanım: tam pencere dolmadan NaN
+    pandas_ta = None
+
+
+def reference_sma(close, w):
+    close = pd.Series(close, dtype="float64")
+    if pandas_ta is not None:
+        return pandas_ta.sma(close, length=w).to_numpy()
+    return close.rolling(w, min_periods=w).mean().to_numpy()
+
+
+def prices(n, seed=0, level=30_000.0):
+    rng = np.random.default_rng(seed)
+    return level * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def frame(close, start="2024-01-01", freq="h"):
+    index = pd.date_range(start, periods=len(close), freq=freq, tz="UTC", name="timestamp")
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+def assert_sma(actual, close, windows=indicators.SMA_WINDOWS):
+    for w, col in zip(windows, actual):
+        np.testing.assert_allclose(col, reference_sma(close, w), rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("n", [0, 1, 19, 20, 199, 200, 201, 5000])
+def test_sma_matrix_matches_reference(n):
+    close = prices(n)
+    assert_sma(indicators.sma_matrix(close), close)
+
+
+def test_sma_matrix_large_level_no_drift():
+    # Kümülatif toplam uzun ve yüksek seviyeli seride kaymasın
+    close = prices(100_000, level=1e9)
+    assert_sma(indicators.sma_matrix(close), close)
+
+
+def test_sma_frame_warmup_alignment():
+    # Isınma satırları kesildikten sonra ilk gösterilen satırda tüm SMA'lar dolu
+    close = prices(24 * 30 + indicators.WARMUP_ROWS)
+    df = frame(close)
+    start = df.index[indicators.WARMUP_ROWS]
+    out = indicators.sma_frame(df, start)
+    assert out.index[0] == start
+    assert len(out) == 24 * 30
+    assert out.iloc[0][[f"SMA{w}" for w in indicators.SMA_WINDOWS]].notna().all()
+    full = indicators.sma_matrix(close)
+    for w, row in zip(indicators.SMA_WINDOWS, full):
+        np.testing.assert_allclose(out[f"SMA{w}"].to_numpy(), row[indicators.WARMUP_ROWS:], rtol=1e-12)
+        np.testing.assert_allclose(out[f"SMA{w}"].to_numpy(), reference_sma(close, w)[indicators.WARMUP_ROWS:],
+                                   rtol=1e-9)
+
+
+def test_sma_frame_empty_window_keeps_last_bar():
+    df = frame(prices(300))
+    out = indicators.sma_frame(df, df.index[-1] + pd.Timedelta(days=2))
+    assert len(out) == 1 and out.index[0] == df.index[-1]
+
+
+def _series_matrix(series):
+    return series.frame()[[f"SMA{w}" for w in series.windows]].to_numpy().T
+
+
+def test_indicator_series_append():
+    close = prices(600)
+    df = frame(close)
+    series = indicators.IndicatorSeries(df.iloc[:250])
+    for ts, price in zip(df.index[250:], close[250:]):
+        series.append(ts.value, price)
+    assert_sma(_series_matrix(series), close)
+
+
+def test_indicator_series_replace_last():
+    close = prices(400)
+    series = indicators.IndicatorSeries(frame(close))
+    expected = close.copy()
+    for price in (1.0, 123_456.0, close[-1] * 1.01):
+        series.update_last(price)
+        expected[-1] = price
+        assert_sma(_series_matrix(series), expected)
+
+
+def test_indicator_series_sync_new_and_revised_bars():
+    close = prices(500)
+    df = frame(close)
+    series = indicators.IndicatorSeries(df.iloc[:300])
+    # Son bar revize edildi + yeni barlar geldi; pencere baştan kaydı (eski satırlar düştü)
+    revised = close.copy()
+    revised[299] *= 1.02
+    newer = frame(revised).iloc[100:]
+    assert series.sync(newer)
+    assert_sma(_series_matrix(series), revised)
+
+
+def test_indicator_series_sync_rejects_gap():
+    df = frame(prices(300))
+    series = indicators.IndicatorSeries(df.iloc[:200])
+    assert not series.sync(df.iloc[250:])
+
+
+def test_cached_sma_frame_incremental_matches_full():
+    close = prices(800)
+    df = frame(close)
+    df.attrs["series_key"] = ("test", "incremental", "1h")
+    indicators.cached_sma_frame(df.iloc[:500].copy())
+    grown = df.copy()
+    out = indicators.cached_sma_frame(grown, df.index[300])
+    expected = indicators.sma_frame(df, df.index[300])
+    pd.testing.assert_frame_equal(out, expected, check_freq=False, check_index_type=False, rtol=1e-9)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+import indicators
+import live_feed
+import market_data
+import metrics
+
+COINS = ["live-a", "live-b", "live-c", "live-d"]
+DAYS = 1
+
+
+@pytest.fixture
+def seeded(offline, monkeypatch):
+    # Sayfa yüklemesi gibi: her coin için önbellekte IndicatorSeries (son bar şu anki kovada);
+    # canlı fiyatlar stub'ın /simple/price'ından, boş fiyat önbelleğiyle
+    monkeypatch.setattr(live_feed, "prices", live_feed.LivePrices())
+    interval = market_data.coingecko_interval(DAYS)
+    step = pd.Timedelta(milliseconds=market_data.INTERVAL_MS[interval])
+    end = pd.Timestamp.now(tz="UTC").floor(step)
+    index = pd.date_range(end=end, periods=400, freq=step, name="timestamp")
+    for cid in COINS:
+        df = pd.DataFrame({"Close": np.ones(len(index))}, index=index)
+        df.attrs["series_key"] = ("coingecko", cid, interval)
+        indicators.cached_sma_frame(df)
+    return interval
+
+
+def fragment(sym, drawn):
+    # render_chart.cell'in canlı dalı: çizilen son nokta oturumda, farklıysa yeniden çiz
+    point = live_feed.apply_ticks(COINS, DAYS, 10).get(sym)
+    redraw = drawn.get(sym) != point
+    drawn[sym] = point
+    return redraw
+
+
+def test_every_fragment_redraws_after_shared_tick(seeded):
+    drawn = {cid: indicators.live_last(("coingecko", cid, seeded)) for cid in COINS}
+    assert [fragment(cid, drawn) for cid in COINS] == [True] * 4
+    assert live_feed.prices.requests == 1  # tek /simple/price isteği
+    # Aynı tick'te tekrar çalışan fragment'ler yeniden çizmez
+    assert [fragment(cid, drawn) for cid in COINS] == [False] * 4
+    assert all(drawn[cid][1] != 1.0 for cid in COINS)
+
+
+@pytest.mark.parametrize("exc", [requests.ConnectionError("down"), ValueError("not json")])
+def test_fetch_error_keeps_last_points(seeded, monkeypatch, exc):
+    def fail(coin_ids):
+        raise exc
+    before = live_feed.apply_ticks(COINS, DAYS, 10)
+    key = (("type", type(exc).__name__), ("where", "live.fetch"))
+    errors = metrics.snapshot("errors_total").get(key, 0)
+    monkeypatch.setattr(live_feed, "prices", live_feed.LivePrices(fetch=fail))
+    assert live_feed.apply_ticks(COINS, DAYS, 10) == before
+    assert metrics.snapshot("errors_total")[key] == errors + 1
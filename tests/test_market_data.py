@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+import pytest
+
+import market_data
+from price_cache import ColumnCache
+
+DAY = market_data.DAY_MS
+
+
+def fake_range(fail=(), listed_at=None):
+    # /market_chart/range yerine: günlük kapanışlar; fail içindeki parça başları None (429 sonrası)
+    calls = []
+
+    def fetch(coin_id, from_ts, to_ts):
+        calls.append((from_ts, to_ts))
+        if any(abs(from_ts - f) < 60_000 for f in fail):  # plan ile çağrı arasında birkaç ms geçer
+            return None
+        lo = max(from_ts, listed_at or 0)
+        ts = np.arange(-(-lo // DAY) * DAY, to_ts, DAY, dtype="int64")
+        return market_data._frame(ts, 100 + (ts // DAY % 50).astype("float64"))
+    fetch.calls = calls
+    return fetch
+
+
+def seed(monkeypatch, coin, days):
+    monkeypatch.setattr(market_data, "fetch_market_chart_range", fake_range())
+    market_data.load_crypto_history(coin, days, interval="1d")
+    return market_data.store.coverage("coingecko", coin, "1d")
+
+
+def age(coin, seconds):
+    cov = market_data.store.coverage("coingecko", coin, "1d")
+    df = market_data.store.read("coingecko", coin, "1d")
+    market_data.store.write("coingecko", coin, "1d", df, cov.first_ts, time.time() - seconds)
+
+
+def test_failed_head_chunk_does_not_extend_coverage(monkeypatch):
+    coin = "head-fails"
+    before = seed(monkeypatch, coin, 30)
+    age(coin, 3600)
+    plan = market_data.crypto_plan(coin, 120, interval="1d")
+    head_from = plan.chunks[0][0]
+    monkeypatch.setattr(market_data, "fetch_market_chart_range", fake_range(fail=[head_from]))
+    market_data.load_crypto_history(coin, 120, interval="1d")
+
+    cov = market_data.store.coverage("coingecko", coin, "1d")
+    assert cov.first_ts == before.first_ts          # baş boşluğu kapsam sayılmadı
+    assert time.time() - cov.fetched_at < 60        # kuyruk geldi → taze
+    again = market_data.crypto_plan(coin, 120, interval="1d")
+    assert [c[0] for c in again.chunks] == [pytest.approx(head_from, abs=60_000)]  # boşluk yeniden çekilecek
+
+
+def test_failed_tail_chunk_keeps_coverage_stale(monkeypatch):
+    coin = "tail-fails"
+    seed(monkeypatch, coin, 30)
+    age(coin, 3600)
+    stale = market_data.store.coverage("coingecko", coin, "1d")
+    plan = market_data.crypto_plan(coin, 120, interval="1d")
+    tail_from = plan.chunks[-1][0]
+    monkeypatch.setattr(market_data, "fetch_market_chart_range", fake_range(fail=[tail_from]))
+    market_data.load_crypto_history(coin, 120, interval="1d")
+
+    cov = market_data.store.coverage("coingecko", coin, "1d")
+    assert cov.first_ts == pytest.approx(plan.start_ts, abs=60_000)  # baş parçası geldi
+    assert cov.fetched_at == pytest.approx(stale.fetched_at)
+    again = market_data.crypto_plan(coin, 120, interval="1d")
+    assert [c[0] for c in again.chunks] == [tail_from]  # kuyruk son bardan
+
+
+def test_failed_first_fetch_writes_nothing(monkeypatch):
+    coin = "cold-fails"
+    plan = market_data.crypto_plan(coin, 30, interval="1d")
+    monkeypatch.setattr(market_data, "fetch_market_chart_range", fake_range(fail=[plan.chunks[0][0]]))
+    assert market_data.load_crypto_history(coin, 30, interval="1d") is None
+    assert market_data.store.coverage("coingecko", coin, "1d") is None
+
+
+def test_empty_head_before_listing_extends_coverage(monkeypatch):
+    # Listelenmeden önceki aralık boş ama başarılı → bir daha istenmez
+    coin = "listed-late"
+    listed_at = market_data._now_ms() - 40 * DAY
+    monkeypatch.setattr(market_data, "fetch_market_chart_range", fake_range(listed_at=listed_at))
+    market_data.load_crypto_history(coin, 30, interval="1d")
+    df = market_data.load_crypto_history(coin, 365, interval="1d")
+    assert df.index[0].value // 1_000_000 >= listed_at
+    assert market_data.crypto_plan(coin, 365, interval="1d").chunks == []
+
+
+@pytest.mark.parametrize("body", [
+    '{"prices":[[1000,1.5],[2000,2.5],[3000,3.5]],"market_caps":[[1000,9]]}',
+    '{"prices": [ [1000, 1.5] , [2000, 2.5],\n [3000, 3.5] ] , "market_caps": [[1000, 9]]}',
+    '{"prices":[[1000,1.5],[2000,2.5],[3000,3.5]]}'.encode(),
+])
+def test_parse_market_chart_formats(body):
+    df = market_data.parse_market_chart(body)
+    assert df["Close"].tolist() == [1.5, 2.5, 3.5]
+    assert market_data.to_epoch_ms(df.index).tolist() == [1000, 2000, 3000]
+
+
+def test_parse_market_chart_drops_null_closes():
+    df = market_data.parse_market_chart('{"prices":[[1000,1.5],[2000,null],[3000,3.5]]}')
+    assert df["Close"].tolist() == [1.5, 3.5]
+    assert df.equals(market_data.parse_market_chart({"prices": [[1000, 1.5], [2000, None], [3000, 3.5]]}))
+
+
+@pytest.mark.parametrize("body", ['{"prices":[]}', '{"prices": [ ] }', '{"total_volumes":[]}',
+                                  '{"prices":null,"market_caps":[[1,2],[3,4]]}',
+                                  '{"prices" : null, "total_volumes": [[1, 2]]}'])
+def test_parse_market_chart_empty(body):
+    assert market_data.parse_market_chart(body).empty
+
+
+def test_mmap_entries_count_against_price_cache_budget(monkeypatch):
+    # mmap'li seriler de bütçeye sayılır → LRU atar, açık mmap / fd sayısı sınırlı kalır
+    monkeypatch.setattr(market_data.history_files, "HISTORY_MMAP", True)
+    cache = ColumnCache(64 * 1024)
+    monkeypatch.setattr(market_data, "price_cache", cache)
+    now = market_data._now_ms()
+    ts = now - np.arange(500)[::-1] * 3_600_000
+    for k in range(40):
+        market_data.store.write("mmap-test", f"s{k}", "1h", market_data._frame(ts, np.full(len(ts), 1.0 + k)), int(ts[0]))
+        assert market_data.read_close("mmap-test", f"s{k}", "1h", int(ts[0]))["Close"].iloc[-1] == 1.0 + k
+    stats = cache.stats()
+    assert 0 < stats["nbytes"] <= stats["max_bytes"]
+    assert stats["evictions"] > 0
+    assert stats["entries"] == 64 * 1024 // (2 * 500 * 8)
+
+
+def test_chunks_are_cut_back_from_the_gap_end():
+    assert list(market_data._chunks([(0, 25)], 10)) == [(0, 5), (5, 15), (15, 25)]
+    assert list(market_data._chunks([(0, 25)], None)) == [(0, 25)]
+
+
+def test_5m_history_stays_at_5m_resolution(offline):
+    # 1 gün + 200×5 dk ısınma: CoinGecko eski kısmı saatlik verir → sadece son gün istenir
+    coin = "five-minute"
+    plan = market_data.crypto_plan(coin, 1, 200)
+    assert plan.interval == "5m"
+    assert plan.chunks[-1][1] == plan.now
+    assert plan.chunks[0][0] >= plan.now - DAY
+    df = market_data.load_crypto_history(coin, 1, 200)
+    steps = np.diff(market_data.to_epoch_ms(df.index))
+    assert set(steps) == {market_data.INTERVAL_MS["5m"]}
+    assert market_data.crypto_plan(coin, 1, 200).chunks == []
@@ -0,0 +1,43 @@
+import pytest
+import requests
+
+import async_fetch
+import metrics
+from coingecko_stub import serve
+from rate_limit import RateLimitedSession, TokenBucket
+
+
+def retries(endpoint):
+    return {dict(labels)["reason"]: v for labels, v in metrics.snapshot("upstream_retries_total").items()
+            if dict(labels)["endpoint"] == endpoint}
+
+
+@pytest.fixture
+def throttled():
+    # Her istek 429 (Retry-After: 0) → iki istemci de aynı sayıda denemeden sonra 429 döner
+    server, url = serve(error_rate=1.0, retry_after=0)
+    yield server.RequestHandlerClass, url
+    server.shutdown()
+
+
+def test_sync_and_async_retry_the_same_way(throttled):
+    stub, url = throttled
+    bucket = TokenBucket(1000, 10)
+    session = RateLimitedSession(requests.Session(), bucket, max_retries=2, backoff=0.0)
+    assert session.get(f"{url}/simple/price", endpoint="t.sync", timeout=5).status_code == 429
+    backend = async_fetch.AsyncCoinGeckoBackend(url, TokenBucket(1000, 10), max_retries=2)
+    try:
+        assert backend.run(backend.get("/simple/price", endpoint="t.async")).status_code == 429
+    finally:
+        backend.close()
+    assert stub.errors == 6
+    assert retries("t.sync") == retries("t.async") == {"429": 2}
+    assert bucket.rate < bucket.max_rate
+
+
+def test_connection_errors_are_retried_then_raised():
+    bucket = TokenBucket(1000, 10)
+    session = RateLimitedSession(requests.Session(), bucket, max_retries=1, backoff=0.0)
+    with pytest.raises(requests.ConnectionError):
+        session.get("http://127.0.0.1:9/", endpoint="t.down", timeout=1)
+    assert retries("t.down") == {"error": 1}
@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import market_data
+import metrics
+from price_store import DEFAULT_PATH
+
+log = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Coin evreni: yerel anlık görüntü + fark güncellemesi (process'ler arası ortak)
+# -------------------------------------------------
+# /coins/markets listesi diske yazılır (data/universe-coingecko.json); yeni
+# process önce dosyayı okur, sadece dosya UNIVERSE_SECONDS'tan eskiyse ağdan
+# tazeler. Tazeleme arka planda: sayfalar o sırada eldeki görüntüyü kullanır.
+# Gelen satırlar mevcut kayıtlarla karşılaştırılır; sadece fiyat / sıra değişir,
+# hariç tutma filtresi sadece yeni id'lere uygulanır. Etiket listesi ve
+# etiket → id sözlüğü üyelik ya da sıra değişince bir kez kurulur.
+UNIVERSE_PATH = os.environ.get("UNIVERSE_PATH", os.path.join(os.path.dirname(DEFAULT_PATH), "universe-coingecko.json"))
+UNIVERSE_SECONDS = 3600  # eski get_coin_list önbelleği ile aynı
+PAGES, PER_PAGE = 4, 250
+_EXCLUDE = re.compile("|".join(map(re.escape, market_data.COIN_EXCLUDE)), re.IGNORECASE)
+
+
+def _label(row):
+    return f'{row["name"]} ({row["symbol"].upper()})'
+
+
+class CoinUniverse:
+    def __init__(self, path=UNIVERSE_PATH, max_age=UNIVERSE_SECONDS, pages=PAGES, per_page=PER_PAGE):
+        self.path = path
+        self.max_age = max_age
+        self.pages = pages
+        self.per_page = per_page
+        self.rows = {}          # id → dict(symbol, name, current_price, market_cap_rank)
+        self.excluded = set()   # filtreye takılan id'ler (bir daha bakılmaz)
+        self.order = []         # id'ler, piyasa değeri sırasıyla
+        self.fetched_at = 0.0
+        self.rate_limited = False
+        self.version = 0        # sıra / etiket değişince artar
+        self.stats = dict(refreshes=0, requests=0, updated=0, added=0, removed=0)
+        self._file_mtime = 0.0
+        self._lists = None      # (version, etiketler, etiket → id, id → etiket)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._load()
+
+    # ---- anlık görüntü dosyası -------------------------------------------
+    def _load(self):
+        # Başka process daha yeni bir görüntü yazdıysa onu al
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime <= self._file_mtime:
+                return False
+            with open(self.path, encoding="utf-8") as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            if snap["fetched_at"] <= self.fetched_at:
+                return False
+            self.rows = snap["rows"]
+            self.excluded = set(snap.get("excluded", []))
+            self.fetched_at = snap["fetched_at"]
+            self._file_mtime = mtime
+            self._reorder()
+        return True
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            snap = dict(fetched_at=self.fetched_at, rows=self.rows, excluded=sorted(self.excluded))
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snap, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        self._file_mtime = os.path.getmtime(self.path)
+
+    # ---- fark güncellemesi --------------------------------------------------
+    def _reorder(self):
+        # Sıra sadece değiştiyse yeni sürüm (seçim kutuları aynı listeyi tutar)
+        order = sorted(self.rows, key=lambda c: (self.rows[c]["market_cap_rank"] or 1e9, c))
+        if order != self.order:
+            self.order = order
+            self.version += 1
+
+    def _apply(self, records, complete):
+        # records: /coins/markets satırları; complete: tüm sayfalar geldi mi (silme sadece o zaman)
+        seen = set()
+        updated = added = 0
+        with self._lock:
+            for rec in records:
+                cid = rec["id"]
+                seen.add(cid)
+                row = self.rows.get(cid)
+                if row is None:
+                    if cid in self.excluded:
+                        continue
+                    if _EXCLUDE.search(cid):
+                        self.excluded.add(cid)
+                        continue
+                    self.rows[cid] = {k: rec.get(k) for k in ("symbol", "name", "current_price", "market_cap_rank")}
+                    added += 1
+                    continue
+                changed = False
+                for k in ("current_price", "market_cap_rank"):
+                    if row[k] != rec.get(k):
+                        row[k] = rec.get(k)
+                        changed = True
+                if row["symbol"] != rec.get("symbol") or row["name"] != rec.get("name"):
+                    # Yeniden adlandırma: etiketler yeniden kurulmalı
+                    row["symbol"], row["name"] = rec.get("symbol"), rec.get("name")
+                    self.version += 1
+                    changed = True
+                updated += changed
+            removed = [cid for cid in self.rows if cid not in seen] if complete else []
+            for cid in removed:
+                del self.rows[cid]
+            self._reorder()
+        self.stats["updated"] += updated
+        self.stats["added"] += added
+        self.stats["removed"] += len(removed)
+        return updated, added, len(removed)
+
+    def refresh(self):
+        # Senkron tazeleme → yapılan istek sayısı; aynı anda tek tazeleme
+        with self._refresh_lock:
+            self._load()
+            if not self.stale():
+                return 0
+            result = market_data.fetch_coin_markets(self.pages, self.per_page)
+            self.stats["requests"] += result.requests
+            self.rate_limited = result.rate_limited
+            if result.records:
+                updated, added, removed = self._apply(result.records, result.complete)
+                self.fetched_at = time.time()
+                self.stats["refreshes"] += 1
+                self._save()
+                log.info("Coin evreni: %d güncellendi, %d yeni, %d çıktı", updated, added, removed)
+            return result.requests
+
+    def stale(self):
+        return time.time() - self.fetched_at >= self.max_age
+
+    def refresh_async(self):
+        # Bayatsa arka planda tazele; hiç görüntü yoksa (ilk kurulum) beklenir
+        if not self.rows:
+            self.refresh()
+        elif self.stale() and not self._refresh_lock.locked():
+            threading.Thread(target=self._refresh_quietly, name="universe-refresh", daemon=True).start()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            metrics.error("universe.refresh", e)
+
+    # ---- sayfalar için ------------------------------------------------------
+    def lists(self):
+        # → (etiketler, etiket → id, id → etiket); sürüm değişmedikçe aynı nesneler
+        with self._lock:
+            cached = self._lists
+            if cached is not None and cached[0] == self.version:
+                metrics.cache_hit("symbol_list", True)
+                return cached[1:]
+            labels, seen = [], set()
+            for cid in self.order:
+                label = _label(self.rows[cid])
+                if label in seen:
+                    # Aynı ad + sembol (ör. farklı zincirdeki kopya): id ile ayrıştır
+                    label = f"{label} · {cid}"
+                seen.add(label)
+                labels.append(label)
+            self._lists = (self.version, labels, dict(zip(labels, self.order)), dict(zip(self.order, labels)))
+            metrics.cache_hit("symbol_list", False)
+            return self._lists[1:]
+
+    def top(self, n):
+        with self._lock:
+            return self.order[:n]
+
+
+coins = CoinUniverse()